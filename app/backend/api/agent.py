@@ -1,19 +1,40 @@
 """HTTP endpoints that expose the research agent."""
+import asyncio
+import json
+import logging
 import os
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 
-from app.backend.api.tools.web import fetch_url, web_search
+from app.backend.api.responses import FastJSONResponse, dumps
+from app.backend.api.run_store import StoredRun, run_store
+from app.backend.api.tools.web import fetch_url, prefetcher, web_search
 from app.backend.core.agent.agent_manager import AgentManager
+from app.backend.core.agent.cancellation import CancelToken, RunCancelled
 from app.backend.core.agent.llm import LLM
-from app.backend.core.agent.mistralLlm import MistralLLM
-from app.backend.core.agent.ollamaLlm import OllamaLLM
-from app.backend.core.agent.openaiLlm import OpenAILLM
+from app.backend.core.agent.llm_router import PHASES, LLMRouter, PhaseRoute
+from app.backend.core.agent.providers import PROVIDERS, load_provider
 from app.backend.core.agent.tool import tool
+from app.backend.core.agent.tool_cache import ToolResultCache
 
 
 router = APIRouter(tags=["Agent"])
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "100"))
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+# Non-standard status (as used by nginx) recorded for runs whose client went away.
+CLIENT_CLOSED_REQUEST = 499
+
+# Outcomes of agent runs (batch queries included) since startup.
+run_counts: Counter = Counter()
 
 
 class AddArgs(BaseModel):
@@ -31,35 +52,298 @@ class AgentRequest(BaseModel):
     query: str
 
 
-def _build_llm() -> LLM:
+class BatchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1, le=32)
+
+
+def _build_llm(provider: Optional[str] = None, model_name: Optional[str] = None) -> LLM:
     """Build the LLM backend based on environment configuration."""
-    provider = os.getenv("LLM_PROVIDER", "openai").lower()
-    if provider == "mistral":
-        model_name = os.getenv("MISTRAL_MODEL", "mistral-medium-2508")
-        return MistralLLM(model_name=model_name)
-    
-    elif provider == "ollama":
-        model_name = os.getenv("OLLAMA_MODEL", "gemma3:12b")
-        return OllamaLLM(model_name=model_name)
+    provider = (provider or os.getenv("LLM_PROVIDER", "openai")).lower()
+    llm_cls = load_provider(provider)
+    spec = PROVIDERS[provider]
+    model_name = model_name or os.getenv(spec.model_env, spec.default_model)
+    return llm_cls(model_name=model_name)
+
+
+def _load_routing_config() -> Dict[str, Dict[str, Any]]:
+    """Read LLM_ROUTING, either inline JSON or the path to a JSON file.
+
+    Example: {"synthesis": {"provider": "ollama", "model": "gemma3:4b"},
+              "final": {"provider": "openai", "model": "gpt-4o",
+                        "input_cost_per_1k": 0.0025, "output_cost_per_1k": 0.01}}
+    """
+    raw = os.getenv("LLM_ROUTING", "").strip()
+    if not raw:
+        return {}
+    if not raw.startswith("{"):
+        with open(raw, encoding="utf-8") as f:
+            raw = f.read()
+    config = json.loads(raw)
+    unknown = set(config) - set(PHASES)
+    if unknown:
+        raise ValueError(f"Unknown phase(s) in LLM_ROUTING: {', '.join(sorted(unknown))}")
+    return config
+
+
+def _build_router(tool_cache: Optional[ToolResultCache] = None) -> LLMRouter:
+    """Build the per-phase router; phases not listed in LLM_ROUTING use the default backend."""
+    config = _load_routing_config()
+    built: Dict[Tuple[str, Optional[str]], LLM] = {}
+    routes: Dict[str, PhaseRoute] = {}
+    for phase in PHASES:
+        entry = config.get(phase, {})
+        provider = (entry.get("provider") or os.getenv("LLM_PROVIDER", "openai")).lower()
+        key = (provider, entry.get("model"))
+        if key not in built:
+            built[key] = _build_llm(provider=key[0], model_name=key[1])
+        routes[phase] = PhaseRoute(
+            llm=built[key],
+            input_cost_per_1k=float(entry.get("input_cost_per_1k", 0.0)),
+            output_cost_per_1k=float(entry.get("output_cost_per_1k", 0.0)),
+        )
+    return LLMRouter(routes, tool_cache=tool_cache)
+
+
+def _register_tools(llms: LLMRouter) -> None:
+    for tool_fn in (web_search, fetch_url, add_a_b):
+        llms.register_decorated_tool(tool_fn)
 
-    model_name = os.getenv("OPENAI_MODEL", "gpt-4o")
-    return OpenAILLM(model_name=model_name)
+
+def _new_manager(query: str, llms: LLMRouter, cancel_token: Optional[CancelToken] = None) -> AgentManager:
+    return AgentManager(
+        user_input=query,
+        llm=llms,
+        dedup_threshold=float(os.getenv("STEP_DEDUP_THRESHOLD", "0.7")) or None,
+        evidence_top_k=int(os.getenv("EVIDENCE_TOP_K", "5")) or None,
+        cancel_token=cancel_token,
+    )
+
+
+async def _execute_until_disconnect(request: Request, manager: AgentManager) -> str:
+    """
+    Run the agent in a worker thread, cancelling it if the client disconnects.
+
+    Raises RunCancelled once the cancelled run has stopped, so its thread is
+    free again when this returns.
+    """
+    task = asyncio.ensure_future(run_in_threadpool(manager.execute))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            manager.cancel_token.cancel()
+            try:
+                await task
+            except Exception:
+                pass
+            raise RunCancelled("Client disconnected")
+
+
+def warm_up_llm() -> None:
+    """Warm up the configured LLM backends so the first /run is not a cold start.
+
+    Failures are logged and ignored: the API must still start when the
+    provider is temporarily unreachable.
+    """
+    if os.getenv("LLM_WARMUP", "1").lower() in ("0", "false", "no"):
+        return
+    try:
+        _build_router().warm_up()
+    except Exception as exc:
+        logger.warning("LLM warm-up failed: %s", exc)
 
 
 @router.post("/run")
-async def run_agent(req: AgentRequest):
-    """Run the autonomous research agent for the provided query."""
+async def run_agent(req: AgentRequest, request: Request, lazy: bool = False):
+    """Run the autonomous research agent for the provided query.
+
+    The finished tree is kept server-side under the returned `run_id`. With
+    `lazy=true` only the tree skeleton is returned; leaf results and tool
+    outputs are then fetched on demand from the `/runs/{run_id}` endpoints.
+    If the client disconnects, the run is cancelled.
+    """
     try:
-        llm = _build_llm()
+        llms = _build_router()
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to initialize language model: {exc}") from exc
 
-    for tool_fn in (web_search, fetch_url, add_a_b):
-        llm.register_decorated_tool(tool_fn)
+    _register_tools(llms)
 
-    manager = AgentManager(user_input=req.query, llm=llm)
+    manager = _new_manager(req.query, llms)
+    run_counts["started"] += 1
     try:
-        result = manager.run()
-        return result
+        final_answer = await _execute_until_disconnect(request, manager)
+    except RunCancelled:
+        run_counts["cancelled"] += 1
+        logger.info("Run cancelled, client disconnected: %r", req.query)
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except Exception as exc:
+        run_counts["failed"] += 1
         raise HTTPException(status_code=500, detail=f"Agent execution failed: {exc}") from exc
+    run_counts["completed"] += 1
+
+    phase_stats = manager.router.stats()
+    logger.info("Phase stats: %s", phase_stats)
+    run = run_store.put(req.query, manager.reasoning_tree, final_answer, phase_stats)
+    # Leaves are encoded directly by FastJSONResponse; the payload matches AgentManager.run().
+    return FastJSONResponse({
+        "run_id": run.run_id,
+        "reasoning_tree": run.reasoning_tree.skeleton() if lazy else run.reasoning_tree.leaves,
+        "final_answer": final_answer,
+        "phase_stats": phase_stats,
+        "pruned_steps": [step.to_dict() for step in run.reasoning_tree.pruned_steps],
+    })
+
+
+@router.post("/run/batch")
+async def run_batch(req: BatchRequest):
+    """Run the agent for several queries, streaming one NDJSON line per finished query.
+
+    The queries share one set of LLM backends (and so their provider clients
+    and rate limiters) and one tool-result cache, and run at most
+    `concurrency` at a time (BATCH_CONCURRENCY by default). Each result line
+    carries the `run_id` of the stored run; the last line is a summary with
+    aggregate throughput, per-phase usage and tool cache statistics. If the
+    client disconnects, the unfinished queries are cancelled.
+    """
+    if len(req.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=422, detail=f"A batch is limited to {BATCH_MAX_QUERIES} queries")
+    tool_cache = ToolResultCache()
+    try:
+        shared = _build_router(tool_cache=tool_cache)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Failed to initialize language model: {exc}") from exc
+    _register_tools(shared)
+    concurrency = min(req.concurrency or BATCH_CONCURRENCY, len(req.queries))
+    cancel_token = CancelToken()
+
+    async def stream():
+        semaphore = asyncio.Semaphore(concurrency)
+        routers: List[LLMRouter] = []
+        started = time.perf_counter()
+
+        async def run_one(index: int, query: str) -> Dict[str, Any]:
+            async with semaphore:
+                llms = shared.fork()
+                routers.append(llms)
+                manager = _new_manager(query, llms, cancel_token)
+                query_started = time.perf_counter()
+                try:
+                    final_answer = await run_in_threadpool(manager.execute)
+                except Exception as exc:
+                    run_counts["failed"] += 1
+                    logger.warning("Batch query %d failed: %s", index, exc)
+                    return {"type": "error", "index": index, "query": query, "error": str(exc)}
+                run_counts["completed"] += 1
+                elapsed = time.perf_counter() - query_started
+                phase_stats = llms.stats()
+                run = run_store.put(query, manager.reasoning_tree, final_answer, phase_stats)
+                return {
+                    "type": "result",
+                    "index": index,
+                    "query": query,
+                    "run_id": run.run_id,
+                    "final_answer": final_answer,
+                    "elapsed_s": round(elapsed, 3),
+                    "phase_stats": phase_stats,
+                }
+
+        run_counts["started"] += len(req.queries)
+        tasks = [asyncio.create_task(run_one(index, query)) for index, query in enumerate(req.queries)]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                succeeded += item["type"] == "result"
+                yield dumps(item) + b"\n"
+        finally:
+            # Reached early when the client disconnects: stop the runs still going.
+            cancel_token.cancel()
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                run_counts["cancelled"] += len(pending)
+                logger.info("Batch cancelled with %d queries unfinished", len(pending))
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "type": "summary",
+            "queries": len(req.queries),
+            "succeeded": succeeded,
+            "failed": len(req.queries) - succeeded,
+            "concurrency": concurrency,
+            "elapsed_s": round(elapsed, 3),
+            "queries_per_min": round(len(req.queries) / elapsed * 60, 2) if elapsed else 0.0,
+            "phase_stats": LLMRouter.combined_stats(routers),
+            "tool_cache": tool_cache.stats(),
+        }
+        logger.info("Batch summary: %s", summary)
+        yield dumps(summary) + b"\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/stats")
+async def get_run_stats():
+    """Counts of started, completed, failed and cancelled agent runs, and prefetch statistics."""
+    stats: Dict[str, Any] = {"runs": {key: run_counts[key] for key in ("started", "completed", "failed", "cancelled")}}
+    if prefetcher.enabled:
+        stats["prefetch"] = prefetcher.stats()
+    return stats
+
+
+def _get_run(run_id: str) -> StoredRun:
+    run = run_store.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run '{run_id}' not found or expired")
+    return run
+
+
+def _check_leaf(run: StoredRun, leaf_id: str) -> None:
+    if leaf_id not in run.reasoning_tree.leaves:
+        raise HTTPException(status_code=404, detail=f"Leaf '{leaf_id}' not found in run '{run.run_id}'")
+
+
+@router.get("/runs/{run_id}/tree")
+async def get_tree_skeleton(run_id: str):
+    """Ids, parents, children and descriptions of every leaf of a finished run."""
+    run = _get_run(run_id)
+    return FastJSONResponse({
+        "run_id": run.run_id,
+        "query": run.query,
+        "root": "leaf_0",
+        "reasoning_tree": run.reasoning_tree.skeleton(),
+        "final_answer": run.final_answer,
+        "pruned_steps": [step.to_dict() for step in run.reasoning_tree.pruned_steps],
+    })
+
+
+@router.get("/runs/{run_id}/leaves/{leaf_id}/children")
+async def get_leaf_children(
+    run_id: str,
+    leaf_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """One page of a leaf's children, as skeletons."""
+    run = _get_run(run_id)
+    _check_leaf(run, leaf_id)
+    tree = run.reasoning_tree
+    return FastJSONResponse({
+        "leaf_id": leaf_id,
+        "offset": offset,
+        "limit": limit,
+        "total": len(tree.leaves[leaf_id].child_leaves),
+        "children": [child.to_skeleton() for child in tree.get_children_page(leaf_id, offset, limit)],
+    })
+
+
+@router.get("/runs/{run_id}/leaves/{leaf_id}")
+async def get_leaf(run_id: str, leaf_id: str):
+    """The full leaf, including its result and tool calls."""
+    run = _get_run(run_id)
+    _check_leaf(run, leaf_id)
+    return FastJSONResponse(run.reasoning_tree.leaves[leaf_id])
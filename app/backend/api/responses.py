@@ -0,0 +1,170 @@
+"""Fast JSON encoding and optional compression for API responses."""
+import gzip
+import io
+import json
+import logging
+import os
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.backend.core.models.tool_calls import ToolCall
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+MIN_COMPRESS_SIZE = 1024
+# Level 9 (Starlette's default) costs several times more CPU on multi-MB
+# trees for only a few percent smaller payloads.
+GZIP_LEVEL = 5
+
+
+def _default(obj: Any) -> Any:
+    """Encode objects the JSON backends do not handle natively."""
+    if isinstance(obj, ToolCall) and hasattr(orjson, "Fragment"):
+        # Embed a stored result's JSON bytes as-is instead of decoding them.
+        raw = obj.result_bytes()
+        if raw is not None:
+            return {"tool_name": obj.tool_name, "args": obj.args, "result": orjson.Fragment(raw)}
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize `content` to JSON bytes.
+
+    With orjson installed, `Leaf` dataclasses are encoded directly from
+    their fields, so a tree can be passed as its `leaves` mapping without
+    building intermediate dicts; blob-stored tool results are embedded as
+    raw JSON when orjson supports fragments. Without orjson, the standard
+    library encoder falls back to each object's `to_dict`.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps`, bypassing FastAPI's jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class _FlushingGzipFile(gzip.GzipFile):
+    """GzipFile that sync-flushes after every write, so each chunk can be decoded on arrival."""
+
+    def write(self, data) -> int:
+        written = super().write(data)
+        self.flush()
+        return written
+
+
+class FlushingGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that flushes the compressor after each body chunk.
+
+    Starlette's responder writes streamed chunks into the gzip stream
+    without flushing, which holds back NDJSON lines (e.g. /run/batch
+    results) until its buffer fills or the response ends. A sync flush costs
+    a few bytes per chunk; single-chunk responses are unaffected.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            # Fresh buffer: the responder's own GzipFile already wrote its header into the old one.
+            responder.gzip_buffer = io.BytesIO()
+            responder.gzip_file = _FlushingGzipFile(
+                mode="wb", fileobj=responder.gzip_buffer, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class BrotliMiddleware:
+    """
+    Brotli-compress complete responses for clients that accept `br`,
+    delegating to gzip for the others. Streaming responses are sent as-is.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_COMPRESS_SIZE, quality: int = 4) -> None:
+        self.app = app
+        self.gzip = FlushingGZipMiddleware(app, minimum_size=minimum_size, compresslevel=GZIP_LEVEL)
+        self.minimum_size = minimum_size
+        self.quality = quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if "br" not in Headers(scope=scope).get("Accept-Encoding", ""):
+            await self.gzip(scope, receive, send)
+            return
+
+        start_message: Message = {}
+        body_started = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, body_started
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or body_started:
+                await send(message)
+                return
+
+            body_started = True
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if message.get("more_body", False) or len(body) < self.minimum_size or "content-encoding" in headers:
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = brotli.compress(body, quality=self.quality)
+            headers["Content-Encoding"] = "br"
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def install_compression(app: FastAPI) -> None:
+    """Enable response compression according to RESPONSE_COMPRESSION (gzip, br or off)."""
+    mode = os.getenv("RESPONSE_COMPRESSION", "").lower()
+    if mode in ("", "0", "off", "none"):
+        return
+    if mode in ("br", "brotli"):
+        if brotli is not None:
+            app.add_middleware(BrotliMiddleware)
+            return
+        logger.warning("RESPONSE_COMPRESSION=br but brotli is not installed; using gzip.")
+        mode = "gzip"
+    if mode != "gzip":
+        raise ValueError(f"Unknown RESPONSE_COMPRESSION '{mode}' (expected gzip, br or off)")
+    app.add_middleware(FlushingGZipMiddleware, minimum_size=MIN_COMPRESS_SIZE, compresslevel=GZIP_LEVEL)
@@ -0,0 +1,78 @@
+"""In-memory store of finished agent runs, served lazily by the tree endpoints."""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.backend.core.reasoningTree.reasoning_tree import ReasoningTree
+
+
+@dataclass
+class StoredRun:
+    run_id: str
+    query: str
+    reasoning_tree: ReasoningTree
+    final_answer: Optional[str]
+    phase_stats: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class RunStore:
+    """
+    Keep the most recent finished runs so their trees can be fetched piece by
+    piece. Bounded by count (least recently used runs are evicted first) and
+    by age.
+    """
+
+    def __init__(self, max_runs: int = 100, ttl_seconds: float = 3600.0):
+        self.max_runs = max_runs
+        self.ttl_seconds = ttl_seconds
+        self._runs: "OrderedDict[str, StoredRun]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [run_id for run_id, run in self._runs.items() if run.created_at < cutoff]
+        for run_id in expired:
+            del self._runs[run_id]
+
+    def put(
+        self,
+        query: str,
+        reasoning_tree: ReasoningTree,
+        final_answer: Optional[str],
+        phase_stats: Optional[Dict[str, Any]] = None,
+    ) -> StoredRun:
+        run = StoredRun(
+            run_id=uuid.uuid4().hex,
+            query=query,
+            reasoning_tree=reasoning_tree,
+            final_answer=final_answer,
+            phase_stats=phase_stats or {},
+        )
+        with self._lock:
+            self._evict_expired()
+            self._runs[run.run_id] = run
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return run
+
+    def get(self, run_id: str) -> Optional[StoredRun]:
+        with self._lock:
+            self._evict_expired()
+            run = self._runs.get(run_id)
+            if run is not None:
+                self._runs.move_to_end(run_id)
+            return run
+
+
+run_store = RunStore(
+    max_runs=int(os.getenv("RUN_STORE_MAX_RUNS", "100")),
+    ttl_seconds=float(os.getenv("RUN_STORE_TTL_SECONDS", "3600")),
+)
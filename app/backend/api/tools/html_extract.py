@@ -0,0 +1,76 @@
+"""CPU-bound HTML parsing for the web tools.
+
+These functions take the raw response bytes and are kept free of heavy
+imports, so they can run in a worker process (see `html_pool`) as well as
+inline.
+"""
+import urllib.parse
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+
+def extract_text(html: bytes, encoding: Optional[str] = None, max_chars: int = 10_000) -> str:
+    """Return the visible text of a page, one block per line."""
+    soup = BeautifulSoup(html, "html.parser", from_encoding=encoding)
+    text = soup.get_text(separator="\n", strip=True)
+    return text[:max_chars]
+
+
+def parse_search_results(html: bytes, encoding: Optional[str] = None, max_results: int = 5) -> List[Dict[str, str]]:
+    """Extract title/url/snippet triples from a DuckDuckGo Lite results page."""
+    soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+
+    # DuckDuckGo Lite usually has <a class="result-link" href="/l/?uddg=..."> but structure can vary.
+    # Try multiple selectors to be more tolerant.
+    links = soup.select('a.result-link')
+    if not links:
+        links = soup.select('a')
+
+    results = []
+    for link in links:
+        try:
+            title = link.get_text(strip=True)
+            raw_url = link.get('href') or ''
+
+            clean_url = None
+            try:
+                qs = urllib.parse.parse_qs(urllib.parse.urlparse(raw_url).query)
+                clean_url = qs.get('uddg', [None])[0]
+            except Exception:
+                clean_url = None
+
+            if not clean_url:
+                if raw_url.startswith('http://') or raw_url.startswith('https://'):
+                    clean_url = raw_url
+                elif raw_url.startswith('/'):
+                    clean_url = urllib.parse.urljoin('https://lite.duckduckgo.com', raw_url)
+
+            if not clean_url:
+                continue
+
+            desc = ''
+            tr = link.find_parent('tr')
+            if tr:
+                tr_next = tr.find_next_sibling('tr')
+                if tr_next:
+                    td = tr_next.find('td', class_='result-snippet')
+                    if td:
+                        desc = td.get_text(strip=True)
+            if not desc:
+                sib = link.find_next_sibling(['span', 'div'])
+                if sib:
+                    desc = sib.get_text(strip=True)
+
+            results.append({
+                'title': title,
+                'url': clean_url,
+                'snippet': desc,
+            })
+
+            if len(results) >= max_results:
+                break
+        except Exception:
+            continue
+
+    return results
@@ -0,0 +1,77 @@
+"""Optional process pool for the parse-and-extract stage of the web tools.
+
+BeautifulSoup parsing is pure Python and holds the GIL, so concurrent tool
+calls in one worker serialize on it. With HTML_POOL_WORKERS > 0, documents
+of at least HTML_POOL_MIN_BYTES are parsed in a bounded pool of processes;
+smaller ones are parsed inline, where the transfer would cost more than it
+saves. Raw response bytes are sent to the workers undecoded (a single
+buffer copy when pickled) and only the extracted result comes back.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+POOL_WORKERS = int(os.getenv("HTML_POOL_WORKERS", "0"))
+MIN_POOL_BYTES = int(os.getenv("HTML_POOL_MIN_BYTES", str(64 * 1024)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Bounds queued work so a burst of fetches waits instead of piling up
+# documents in memory in front of the pool.
+_slots = threading.BoundedSemaphore(max(POOL_WORKERS, 1) * 2)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs server threads is unsafe.
+            _pool = ProcessPoolExecutor(
+                max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget `pool` (if still current) so that the next call starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_parser(fn: Callable[..., T], html: bytes, *args: Any) -> T:
+    """
+    Run `fn(html, *args)` in the pool when enabled and worthwhile, else inline.
+
+    If a worker dies (e.g. killed for memory), the pool is broken for every
+    document in flight: it is replaced and the document retried once in the
+    new pool. A second failure is raised, as that document is the likely
+    cause; it is not parsed inline, where it could take down the server.
+    """
+    if POOL_WORKERS <= 0 or len(html) < MIN_POOL_BYTES:
+        return fn(html, *args)
+    with _slots:
+        for attempt in range(2):
+            pool = _get_pool()
+            try:
+                return pool.submit(fn, html, *args).result()
+            except BrokenProcessPool:
+                _discard_pool(pool)
+                if attempt:
+                    raise
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
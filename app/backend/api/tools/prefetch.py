@@ -0,0 +1,184 @@
+"""Opt-in speculative prefetch of the pages returned by web_search.
+
+After a search, the planner usually fetches the top results, but only after
+a synthesis call and a new planning call. With PREFETCH_TOP_N > 0,
+web_search starts fetching its top N result URLs in the background, and
+fetch_url takes the page from this short-lived cache (or waits for the fetch
+already in flight) instead of downloading it again.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+# A fetch_url result and the number of bytes downloaded to produce it.
+Page = Tuple[Dict[str, Any], int]
+
+
+@dataclass
+class _Entry:
+    created: float
+    future: Optional[Future] = None
+    downloaded: int = 0
+    size: int = 0
+
+
+def _result_size(result: Dict[str, Any]) -> int:
+    return sum(len(str(value).encode("utf-8")) for value in result.values())
+
+
+class Prefetcher:
+    """
+    Background page fetcher with a TTL- and memory-bounded cache.
+
+    At most `workers` pages are fetched at once and at most twice as many
+    are queued; further URLs are skipped rather than queued. Cached pages
+    expire after `ttl_seconds`, and the oldest are evicted once they take
+    more than `max_bytes`. A cached page is handed out once.
+
+    `wasted_bytes` counts the bytes downloaded for pages that expired or
+    were evicted before any fetch_url asked for them.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Page],
+        top_n: int = 0,
+        workers: int = 4,
+        ttl_seconds: float = 120.0,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.fetch = fetch
+        self.top_n = top_n
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._counts = {"scheduled": 0, "skipped": 0, "failed": 0, "hits": 0, "misses": 0}
+        self._downloaded_bytes = 0
+        self._wasted_bytes = 0
+
+    @classmethod
+    def from_env(cls, fetch: Callable[[str], Page]) -> "Prefetcher":
+        return cls(
+            fetch,
+            top_n=int(os.getenv("PREFETCH_TOP_N", "0")),
+            workers=int(os.getenv("PREFETCH_CONCURRENCY", "4")),
+            ttl_seconds=float(os.getenv("PREFETCH_TTL_SECONDS", "120")),
+            max_bytes=int(os.getenv("PREFETCH_MAX_BYTES", str(32 * 1024 * 1024))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0
+
+    def schedule(self, urls: Iterable[str]) -> None:
+        """Start fetching the first `top_n` of `urls` that are not cached yet."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._expire()
+            for url in list(urls)[:self.top_n]:
+                if url in self._entries:
+                    continue
+                if self._pending >= 2 * self.workers:
+                    self._counts["skipped"] += 1
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="prefetch")
+                entry = _Entry(created=time.monotonic())
+                self._entries[url] = entry
+                self._pending += 1
+                self._counts["scheduled"] += 1
+                entry.future = self._executor.submit(self._run, url, entry)
+
+    def _run(self, url: str, entry: _Entry) -> Optional[Dict[str, Any]]:
+        try:
+            result, downloaded = self.fetch(url)
+        except Exception as exc:
+            result, downloaded = {"error": str(exc)}, 0
+        failed = "error" in result
+        with self._lock:
+            self._pending -= 1
+            self._downloaded_bytes += downloaded
+            entry.downloaded = downloaded
+            if failed:
+                self._counts["failed"] += 1
+                if self._entries.get(url) is entry:
+                    del self._entries[url]
+            elif self._entries.get(url) is entry:
+                entry.size = _result_size(result)
+                self._bytes += entry.size
+                self._evict()
+        return None if failed else result
+
+    def take(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the prefetched result for `url`, waiting for it if still in flight."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._expire()
+            entry = self._entries.pop(url, None)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            self._counts["hits"] += 1
+            self._bytes -= entry.size
+        try:
+            result = entry.future.result()
+        except CancelledError:
+            result = None
+        if result is None:
+            # The prefetch failed; count it as a miss so the caller's fetch is not a hit.
+            with self._lock:
+                self._counts["hits"] -= 1
+                self._counts["misses"] += 1
+        return result
+
+    def _discard(self, url: str) -> None:
+        entry = self._entries.pop(url)
+        self._bytes -= entry.size
+        self._wasted_bytes += entry.downloaded
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [
+            url for url, entry in self._entries.items()
+            if entry.created < deadline and entry.future.done()
+        ]
+        for url in expired:
+            self._discard(url)
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            oldest = next((url for url, entry in self._entries.items() if entry.future.done()), None)
+            if oldest is None:
+                break
+            self._discard(oldest)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {
+                **self._counts,
+                "hit_rate": round(self._counts["hits"] / lookups, 4) if lookups else 0.0,
+                "cached_pages": len(self._entries),
+                "cached_bytes": self._bytes,
+                "downloaded_bytes": self._downloaded_bytes,
+                "wasted_bytes": self._wasted_bytes,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
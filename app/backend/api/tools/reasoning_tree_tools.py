@@ -1,4 +1,3 @@
-import json
 from pydantic import BaseModel, Field
 from typing import Any, List, Dict
 from app.backend.core.agent.tool import tool
@@ -25,7 +24,7 @@ def add_leaf_to_reasoning_tree(args: AddLeafArgs) -> dict:
         ]
 
         leaf = LlmLeaf(args.description, tool_calls)
-        return json.loads(json.dumps(leaf.to_dict()))
+        return leaf.to_dict()
 
     except Exception as e:
         return {"status": "error", "error": str(e)}
@@ -1,11 +1,24 @@
-import json
+from typing import TYPE_CHECKING, Optional, Tuple
 from pydantic import BaseModel, Field
-import requests
-from bs4 import BeautifulSoup
 import urllib.parse
 
+from app.backend.api.tools.html_pool import run_parser
+from app.backend.api.tools.prefetch import Prefetcher
 from app.backend.core.agent.tool import tool
 
+if TYPE_CHECKING:
+    import requests
+
+# requests and bs4 (via html_extract) are imported inside the tools so that
+# importing the API does not pay for them until a web tool actually runs.
+
+
+def _declared_encoding(response: "requests.Response") -> Optional[str]:
+    """Charset from the Content-Type header, if any; otherwise let the parser sniff it."""
+    if "charset" in response.headers.get("content-type", "").lower():
+        return response.encoding
+    return None
+
 
 class WebSearchArgs(BaseModel):
     query: str = Field(..., description="Search query")
@@ -22,62 +35,13 @@ def web_search(args: WebSearchArgs) -> dict:
     }
 
     try:
+        import requests
+        from app.backend.api.tools.html_extract import parse_search_results
+
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # DuckDuckGo Lite usually has <a class="result-link" href="/l/?uddg=..."> but structure can vary.
-        # Try multiple selectors to be more tolerant.
-        links = soup.select('a.result-link')
-        if not links:
-            links = soup.select('a')
-
-        results = []
-        for link in links:
-            try:
-                title = link.get_text(strip=True)
-                raw_url = link.get('href') or ''
-
-                clean_url = None
-                try:
-                    qs = urllib.parse.parse_qs(urllib.parse.urlparse(raw_url).query)
-                    clean_url = qs.get('uddg', [None])[0]
-                except Exception:
-                    clean_url = None
-
-                if not clean_url:
-                    if raw_url.startswith('http://') or raw_url.startswith('https://'):
-                        clean_url = raw_url
-                    elif raw_url.startswith('/'):
-                        clean_url = urllib.parse.urljoin('https://lite.duckduckgo.com', raw_url)
-
-                if not clean_url:
-                    continue
-
-                desc = ''
-                tr = link.find_parent('tr')
-                if tr:
-                    tr_next = tr.find_next_sibling('tr')
-                    if tr_next:
-                        td = tr_next.find('td', class_='result-snippet')
-                        if td:
-                            desc = td.get_text(strip=True)
-                if not desc:
-                    sib = link.find_next_sibling(['span', 'div'])
-                    if sib:
-                        desc = sib.get_text(strip=True)
-
-                results.append({
-                    'title': title,
-                    'url': clean_url,
-                    'snippet': desc,
-                })
-
-                if len(results) >= args.max_results:
-                    break
-            except Exception:
-                continue
-
+        results = run_parser(parse_search_results, response.content, _declared_encoding(response), args.max_results)
+        prefetcher.schedule(result['url'] for result in results)
         return {'results': results}
 
     except Exception as e:
@@ -86,13 +50,27 @@ def web_search(args: WebSearchArgs) -> dict:
 class FetchURLArgs(BaseModel):
     url: str = Field(..., description="URL of the webpage to read")
 
-@tool("fetch_url", FetchURLArgs, "Fetch and clean the content of a public webpage.")
-def fetch_url(args: FetchURLArgs) -> dict:
+def _fetch_page(url: str) -> Tuple[dict, int]:
+    """Return the fetch_url result for `url` and the number of bytes downloaded."""
     try:
-        response = requests.get(args.url, timeout=10)
+        import requests
+        from app.backend.api.tools.html_extract import extract_text
+
+        response = requests.get(url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        text = soup.get_text(separator="\n", strip=True)
-        return json.loads(json.dumps({"text": text[:10_000]}))
+        text = run_parser(extract_text, response.content, _declared_encoding(response), 10_000)
+        return {"text": text}, len(response.content)
     except Exception as e:
-        return {"error": str(e)}
+        return {"error": str(e)}, 0
+
+
+# Fetches the top web_search results ahead of fetch_url when PREFETCH_TOP_N > 0.
+prefetcher = Prefetcher.from_env(_fetch_page)
+
+
+@tool("fetch_url", FetchURLArgs, "Fetch and clean the content of a public webpage.")
+def fetch_url(args: FetchURLArgs) -> dict:
+    prefetched = prefetcher.take(args.url)
+    if prefetched is not None:
+        return prefetched
+    return _fetch_page(args.url)[0]
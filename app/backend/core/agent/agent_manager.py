@@ -1,52 +1,146 @@
 import json
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field, TypeAdapter
+from typing import Any, Dict, List, Optional, Tuple, Union
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from app.backend.core.agent.cancellation import CancelToken
 from app.backend.core.agent.llm import LLM
+from app.backend.core.agent.llm_router import FINAL, PLANNING, SYNTHESIS, LLMRouter
 from app.backend.core.models.tool_calls import ToolCall
 from app.backend.core.reasoningTree.reasoning_tree import ReasoningTree
+from app.backend.core.reasoningTree.step_index import StepIndex
+from app.backend.core.retrieval.bm25_index import BM25Index, format_chunks
 
 import re
 
 def strip_json_markdown(response: str) -> str:
     return re.sub(r"^```(?:json)?\n|\n```$", "", response.strip())
 
+class FinalAnswer(BaseModel):
+    answer: str
+
+
 class PlannedStep(BaseModel):
-    description: str
+    description: str = ""
     tool_calls: List[Dict[str, Any]] = Field(default_factory=list)
+    # Set when the model can already answer; the step's branch is not expanded.
+    final: Optional[FinalAnswer] = None
+
+    @model_validator(mode="after")
+    def _description_or_final(self) -> "PlannedStep":
+        # Only a final-answer step may leave out its description.
+        if not self.description.strip() and self.final is None:
+            raise ValueError("a step needs a description or a final answer")
+        return self
+
+
+# Tool results up to this size are passed to the synthesis prompt verbatim;
+# larger ones are replaced by their most relevant indexed chunks.
+EVIDENCE_INLINE_MAX_CHARS = 1500
 
 
 class AgentManager:
 
-    def __init__(self, user_input: str, llm: LLM):
+    def __init__(
+        self,
+        user_input: str,
+        llm: Union[LLM, LLMRouter],
+        dedup_threshold: Optional[float] = 0.7,
+        evidence_top_k: Optional[int] = 5,
+        cancel_token: Optional[CancelToken] = None,
+    ):
+        """
+        Args:
+            user_input: The user's request.
+            llm: A single LLM for every phase, or a per-phase LLMRouter.
+            dedup_threshold: Similarity above which a planned step is skipped
+                as a near-duplicate of an existing leaf. None disables pruning.
+            evidence_top_k: Number of indexed tool-output chunks given to each
+                synthesis prompt (twice as many for the final report). None
+                sends full tool outputs, as before.
+            cancel_token: When cancelled, the run raises RunCancelled at the
+                next planning step, provider call or tool call.
+        """
         self.user_input = user_input
         self.reasoning_tree = ReasoningTree(user_input)
-        self.llm = llm
+        self.router = llm if isinstance(llm, LLMRouter) else LLMRouter.single(llm)
+        self.llm = self.router.tools_llm
+        self.step_index = StepIndex(threshold=dedup_threshold) if dedup_threshold else None
+        self.evidence_top_k = evidence_top_k
+        self.evidence_index = BM25Index() if evidence_top_k else None
+        self._evidence_groups = 0
+        # Leaf id -> index group holding that leaf's tool outputs.
+        self._leaf_groups: Dict[str, str] = {}
+        self.cancel_token = cancel_token or CancelToken()
         self.final_answer: Optional[str] = None
 
-    def run(self) -> Dict[str, Any]:
+    def execute(self) -> str:
+        """
+        Build the reasoning tree and return the final answer.
+
+        When the root plan only contains final answers (no tool calls), they
+        are returned as is, without expanding the tree or a finalize pass.
+        """
         context = self.reasoning_tree.get_reasoning_tree_context()
-        self.plan(context, parent_leaf_id="leaf_0")
-        final_answer = self.finalize()
+        steps = self._request_plan(context)
+        if steps and all(step.final is not None and not step.tool_calls for step in steps):
+            return self._record_final_answer("\n\n".join(step.final.answer for step in steps))
+        self._expand(steps, context, parent_leaf_id="leaf_0")
+        return self.finalize()
+
+    def run(self) -> Dict[str, Any]:
+        final_answer = self.execute()
         return {
             "reasoning_tree": self.reasoning_tree.to_dict(),
             "final_answer": final_answer,
+            "phase_stats": self.router.stats(),
+            "pruned_steps": [step.to_dict() for step in self.reasoning_tree.pruned_steps],
         }
 
     def plan(self, context: str, parent_leaf_id: str, max_branch_len: int = 5):
-        response = self.llm.generate(context)
+        self.cancel_token.raise_if_cancelled()
+        self._expand(self._request_plan(context), context, parent_leaf_id, max_branch_len)
+
+    def _request_plan(self, context: str) -> List[PlannedStep]:
+        """
+        Ask the planning LLM for the next steps. An unparsable reply means no
+        steps; invalid steps, such as ones with neither a description nor a
+        final answer, are skipped.
+        """
+        response = self.router.generate(PLANNING, context, cancel_token=self.cancel_token)
         cleaned = strip_json_markdown(response)
         try:
             data = json.loads(cleaned)
-            steps = TypeAdapter(List[PlannedStep]).validate_python(data)
-        except Exception:
-            return
-        if not steps:
-            return
+        except ValueError:
+            return []
+        if not isinstance(data, list):
+            return []
+        steps = []
+        for item in data:
+            try:
+                steps.append(PlannedStep.model_validate(item))
+            except ValidationError:
+                continue
+        return steps
 
+    def _expand(self, steps: List[PlannedStep], context: str, parent_leaf_id: str, max_branch_len: int = 5):
         for step in steps:
+            if self._prune_if_duplicate(step, parent_leaf_id):
+                continue
+
+            if step.final is not None and not step.tool_calls:
+                # Nothing to run or synthesize: the model's answer is the step's outcome.
+                new_leaf_id = self.reasoning_tree.add_leaf(
+                    description=step.description,
+                    parent_leaf=parent_leaf_id,
+                    tool_calls=[],
+                    result=step.final.answer
+                )
+                if self.step_index is not None:
+                    self.step_index.add(new_leaf_id, step.description, step.tool_calls)
+                continue
+
             tool_calls = [ToolCall(tool_name=tc['tool_name'], args=tc['args']) for tc in step.tool_calls]
             for call in tool_calls:
-                call.result = self.llm.run_tool(call.tool_name, call.args)
+                call.result = self.router.run_tool(call.tool_name, call.args, self.cancel_token)
 
             FILL_RESULT_PROMPT = """
             You are an autonomous reasoning agent.
@@ -55,11 +149,19 @@ class AgentManager:
 
             Respond with a short, informative paragraph only. Do not include JSON, code fences, or explanations of your process.
             """
-            tool_results_text = "\n".join(f"{call.tool_name}: {call.result}" for call in tool_calls)
+            group = None
+            if self.evidence_index is None:
+                tool_results_text = "\n".join(f"{call.tool_name}: {call.result}" for call in tool_calls)
+                previous_context = context
+            else:
+                tool_results_text, group = self._index_tool_results(step.description, tool_calls, parent_leaf_id)
+                # Ancestors' raw tool outputs are replaced by the excerpts retrieved
+                # from them above; keep their conclusions only.
+                previous_context = self.reasoning_tree.get_leaf_context(parent_leaf_id, include_tool_results=False)
 
             user_input = f"""
             PREVIOUS CONTEXT:
-            {context}
+            {previous_context}
 
             STEP DESCRIPTION:
             {step.description}
@@ -70,7 +172,12 @@ class AgentManager:
             What conclusion or synthesis should be recorded for this step?
             """
 
-            result = self.llm.generate(user_input=user_input.strip(), system_prompt=FILL_RESULT_PROMPT.strip())
+            result = self.router.generate(
+                SYNTHESIS,
+                user_input=user_input.strip(),
+                system_prompt=FILL_RESULT_PROMPT.strip(),
+                cancel_token=self.cancel_token,
+            )
 
             new_leaf_id = self.reasoning_tree.add_leaf(
                 description=step.description,
@@ -78,7 +185,13 @@ class AgentManager:
                 tool_calls=tool_calls,
                 result=result
             )
+            if group is not None:
+                self._leaf_groups[new_leaf_id] = group
+            if self.step_index is not None:
+                self.step_index.add(new_leaf_id, step.description, step.tool_calls)
 
+            if step.final is not None:
+                continue
             branch_depth = self.reasoning_tree.get_branch_depth(new_leaf_id)
             if branch_depth >= max_branch_len:
                 continue
@@ -86,20 +199,88 @@ class AgentManager:
             enriched_context = self.reasoning_tree.get_leaf_context(new_leaf_id)
             self.plan(enriched_context, parent_leaf_id=new_leaf_id, max_branch_len=max_branch_len)
 
+    def _index_tool_results(
+        self, description: str, tool_calls: List[ToolCall], parent_leaf_id: str
+    ) -> Tuple[str, str]:
+        """
+        Index the step's tool outputs and return the TOOL RESULTS section and
+        the step's index group. Small outputs are listed verbatim; large ones,
+        and the tool outputs of the step's ancestors, contribute their chunks
+        most relevant to the step.
+        """
+        self._evidence_groups += 1
+        group = f"step_{self._evidence_groups}"
+        lines = []
+        large_outputs = False
+        for call in tool_calls:
+            result = call.result
+            self.evidence_index.add_tool_result(call.tool_name, call.args, result, group=group)
+            result_text = f"{result}"
+            if len(result_text) <= EVIDENCE_INLINE_MAX_CHARS:
+                lines.append(f"{call.tool_name}: {result_text}")
+            else:
+                large_outputs = True
+                lines.append(f"{call.tool_name}({call.args}): {len(result_text)} characters, relevant excerpts below.")
+
+        # Small outputs of this step are already listed in full.
+        groups = self._ancestor_groups(parent_leaf_id) + ([group] if large_outputs else [])
+        query = " ".join([description, *(str(value) for call in tool_calls for value in call.args.values())])
+        chunks = self.evidence_index.search(query, k=self.evidence_top_k, groups=groups) if groups else []
+        if chunks:
+            lines.append("RELEVANT EXCERPTS:\n" + format_chunks(chunks))
+        return "\n".join(lines), group
+
+    def _ancestor_groups(self, leaf_id: str) -> List[str]:
+        """Index groups of `leaf_id` and its ancestors that ran tools."""
+        groups = []
+        leaf = self.reasoning_tree.leaves.get(leaf_id)
+        while leaf is not None:
+            if leaf.id in self._leaf_groups:
+                groups.append(self._leaf_groups[leaf.id])
+            leaf = self.reasoning_tree.leaves.get(leaf.parent_leaf) if leaf.parent_leaf is not None else None
+        return groups
+
+    def _prune_if_duplicate(self, step: PlannedStep, parent_leaf_id: str) -> bool:
+        """Record and skip `step` if it repeats a leaf already in the tree."""
+        if self.step_index is None:
+            return False
+        duplicate = self.step_index.find_duplicate(step.description, step.tool_calls)
+        if duplicate is None:
+            return False
+        duplicate_of, similarity = duplicate
+        self.reasoning_tree.add_pruned_step(
+            description=step.description,
+            parent_leaf=parent_leaf_id,
+            tool_calls=step.tool_calls,
+            duplicate_of=duplicate_of,
+            similarity=similarity,
+        )
+        return True
+
     def finalize(self) -> str:
         """Generate the final answer based on every terminal leaf."""
-        leaves = self.reasoning_tree.get_reasoning_tree_context()
+        if self.evidence_index is None:
+            leaves = self.reasoning_tree.get_reasoning_tree_context()
+        else:
+            chunks = self.evidence_index.search(self.user_input, k=2 * self.evidence_top_k)
+            leaves = self.reasoning_tree.get_reasoning_tree_context(include_tool_results=False)
+            if chunks:
+                leaves += "\n\n====================\n\nSUPPORTING EVIDENCE:\n\n" + format_chunks(chunks)
 
         FINAL_PROMPT = f"""
         You are a deep research agent responding to the user's original request: {self.user_input}.
         Use the reasoning tree summary below to craft a professional, well-structured final report.
         """
 
-        final_answer = self.llm.generate(
+        final_answer = self.router.generate(
+            FINAL,
             user_input=leaves,
-            system_prompt=FINAL_PROMPT.strip()
+            system_prompt=FINAL_PROMPT.strip(),
+            cancel_token=self.cancel_token,
         )
+        return self._record_final_answer(final_answer)
 
+    def _record_final_answer(self, final_answer: str) -> str:
         self.reasoning_tree.add_leaf(
             description="Final answer",
             parent_leaf="leaf_0",
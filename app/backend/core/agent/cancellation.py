@@ -0,0 +1,62 @@
+"""Cooperative cancellation of agent runs."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+
+class RunCancelled(Exception):
+    """Raised at a cancellation checkpoint once the run's token is cancelled."""
+
+
+class CancelToken:
+    """
+    Thread-safe cancellation flag shared by everything working for one run.
+
+    Runs check it between steps and before each provider or tool call, and
+    waits (rate limiting, retry backoff, concurrency slots) are cut short
+    when it is cancelled. A request already sent to a provider or a website
+    is not interrupted; its result is discarded at the next checkpoint.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise RunCancelled("Run was cancelled")
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep for `seconds`, raising RunCancelled as soon as the token is cancelled."""
+        if self._event.wait(seconds):
+            raise RunCancelled("Run was cancelled")
+
+
+def check(cancel_token: Optional[CancelToken]) -> None:
+    """Checkpoint for code where the token is optional."""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+
+def sleep(seconds: float, cancel_token: Optional[CancelToken]) -> None:
+    if cancel_token is None:
+        time.sleep(seconds)
+    else:
+        cancel_token.sleep(seconds)
+
+
+def acquire(semaphore: threading.Semaphore, cancel_token: Optional[CancelToken], poll: float = 0.1) -> None:
+    """Acquire `semaphore`, giving up with RunCancelled if the token is cancelled while waiting."""
+    if cancel_token is None:
+        semaphore.acquire()
+        return
+    while not semaphore.acquire(timeout=poll):
+        cancel_token.raise_if_cancelled()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 import json
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, List, Optional, Type
 from pydantic import BaseModel
 
+from app.backend.core.agent import cancellation
+from app.backend.core.agent.cancellation import CancelToken
+from app.backend.core.agent.rate_limit import RetryPolicy, estimate_tokens, get_rate_limiter
 from app.backend.core.models.prompt import SYSTEM_PROMPT
 
 class ToolSpec(BaseModel):
@@ -22,10 +25,16 @@ class LLM(ABC):
     - Expose tool specifications for prompt injection or native tool-calling
     - Define a consistent interface for initializing the provider client
       and generating responses
+    - Apply the shared per-provider rate limiter and retry policy to
+      provider calls
     """
 
+    #: Provider key used for rate limiting (`<PROVIDER>_RPM` / `<PROVIDER>_TPM`).
+    provider: str = "llm"
+
     def __init__(self, model_name: str):
         self.model_name = model_name
+        self.retry_policy = RetryPolicy.from_env()
         self.client = self.init_client()
         self._tools: Dict[str, ToolSpec] = {}
         self._tool_runners: Dict[str, Any] = {}
@@ -36,10 +45,51 @@ class LLM(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def generate(self, user_input: str, system_prompt: Optional[str] = None) -> str:
-        """Return the text (or JSON string) generated by the LLM."""
+    def generate(
+        self, user_input: str, system_prompt: Optional[str] = None, cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Return the text (or JSON string) generated by the LLM.
+
+        Implementations pass `cancel_token` to `_call_provider`, which raises
+        RunCancelled instead of (re)trying once it is cancelled.
+        """
         raise NotImplementedError
 
+    def warm_up(self) -> None:
+        """
+        Prepare the provider for its first request (e.g. load a local model).
+        No-op by default; override in subclasses that benefit from it.
+        """
+        return None
+
+    def _call_provider(
+        self, request: Callable[[], str], prompt: str, cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Run a provider request under the process-wide rate limiter for this
+        provider and model, retrying throttling and transient failures.
+
+        Args:
+            request: Performs a single provider call and returns the output text.
+            prompt: The full prompt sent, used to estimate input tokens.
+            cancel_token: Checked before each attempt and while waiting for
+                the rate limiter or a retry; the output of a request that
+                completes after cancellation is discarded.
+        """
+        limiter = get_rate_limiter(self.provider, self.model_name)
+        estimated = estimate_tokens(prompt)
+
+        def attempt() -> str:
+            limiter.acquire(estimated, cancel_token)
+            output = request()
+            limiter.record(estimate_tokens(output or ""))
+            return output
+
+        output = self.retry_policy.call(attempt, cancel_token)
+        cancellation.check(cancel_token)
+        return output
+
     def register_tool(
         self,
         name: str,
@@ -90,7 +140,9 @@ class LLM(ABC):
         """
         return False
 
-    def run_tool(self, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    def run_tool(
+        self, name: str, args: Dict[str, Any], cancel_token: Optional[CancelToken] = None
+    ) -> Dict[str, Any]:
         """
         Execute a registered tool by name, validating arguments against its
         associated Pydantic model before execution.
@@ -98,6 +150,7 @@ class LLM(ABC):
         Args:
             name: The name of the registered tool.
             args: The input arguments as a dictionary.
+            cancel_token: The tool is not started if the run is cancelled.
 
         Returns:
             The result of the tool execution.
@@ -108,6 +161,7 @@ class LLM(ABC):
         model = entry["args_model"]
         fn = entry["fn"]
         parsed = model(**args)
+        cancellation.check(cancel_token)
         return fn(parsed)
 
     def _compose_system_prompt(self, system_prompt: Optional[str]) -> str:
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.backend.core.agent.cancellation import CancelToken
+from app.backend.core.agent.llm import LLM
+from app.backend.core.agent.rate_limit import estimate_tokens
+from app.backend.core.agent.tool_cache import ToolResultCache
+
+
+PLANNING = "planning"
+SYNTHESIS = "synthesis"
+FINAL = "final"
+PHASES = (PLANNING, SYNTHESIS, FINAL)
+
+
+@dataclass
+class PhaseRoute:
+    """An LLM assigned to a phase, with optional pricing for cost reporting."""
+
+    llm: LLM
+    input_cost_per_1k: float = 0.0
+    output_cost_per_1k: float = 0.0
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "latency_s": round(self.latency_s, 4),
+            "avg_latency_s": round(self.latency_s / self.calls, 4) if self.calls else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost": round(self.cost, 6),
+        }
+
+
+class LLMRouter:
+    """
+    Dispatch each agent phase (planning, per-step synthesis, final report)
+    to its own LLM, possibly from different providers.
+
+    Tools are executed by the planning LLM, since it is the one that
+    advertises them in its system prompt. Latency, estimated tokens and
+    cost are accumulated per phase. With a `tool_cache`, identical tool
+    calls are answered from the cache.
+    """
+
+    def __init__(self, routes: Dict[str, PhaseRoute], tool_cache: Optional[ToolResultCache] = None):
+        missing = [phase for phase in PHASES if phase not in routes]
+        if missing:
+            raise ValueError(f"No LLM routed for phase(s): {', '.join(missing)}")
+        self.routes = routes
+        self.tool_cache = tool_cache
+        self._stats: Dict[str, PhaseStats] = {phase: PhaseStats() for phase in PHASES}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def single(cls, llm: LLM) -> "LLMRouter":
+        """Route every phase to the same LLM."""
+        route = PhaseRoute(llm=llm)
+        return cls({phase: route for phase in PHASES})
+
+    def fork(self) -> "LLMRouter":
+        """
+        A router over the same LLMs (clients, registered tools) and tool
+        cache, with its own usage stats; used to run several queries on
+        shared backends while reporting each one separately.
+        """
+        return LLMRouter(self.routes, tool_cache=self.tool_cache)
+
+    def llm_for(self, phase: str) -> LLM:
+        return self.routes[phase].llm
+
+    @property
+    def tools_llm(self) -> LLM:
+        return self.llm_for(PLANNING)
+
+    def distinct_llms(self) -> List[LLM]:
+        seen: Dict[int, LLM] = {}
+        for route in self.routes.values():
+            seen.setdefault(id(route.llm), route.llm)
+        return list(seen.values())
+
+    def register_decorated_tool(self, func) -> None:
+        """Register a tool on every distinct routed LLM."""
+        for llm in self.distinct_llms():
+            llm.register_decorated_tool(func)
+
+    def run_tool(
+        self, name: str, args: Dict[str, Any], cancel_token: Optional[CancelToken] = None
+    ) -> Dict[str, Any]:
+        if self.tool_cache is None:
+            return self.tools_llm.run_tool(name, args, cancel_token)
+        return self.tool_cache.get_or_run(name, args, lambda: self.tools_llm.run_tool(name, args, cancel_token))
+
+    def warm_up(self) -> None:
+        for llm in self.distinct_llms():
+            llm.warm_up()
+
+    def generate(
+        self,
+        phase: str,
+        user_input: str,
+        system_prompt: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None,
+    ) -> str:
+        """Generate with the LLM routed for `phase` and record its usage."""
+        route = self.routes[phase]
+        start = time.perf_counter()
+        output = route.llm.generate(user_input=user_input, system_prompt=system_prompt, cancel_token=cancel_token)
+        elapsed = time.perf_counter() - start
+
+        sent_system_prompt = system_prompt or route.llm._compose_system_prompt(None)
+        input_tokens = estimate_tokens(user_input) + estimate_tokens(sent_system_prompt)
+        output_tokens = estimate_tokens(output or "")
+        cost = (
+            input_tokens * route.input_cost_per_1k + output_tokens * route.output_cost_per_1k
+        ) / 1000
+        with self._lock:
+            stats = self._stats[phase]
+            stats.calls += 1
+            stats.latency_s += elapsed
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cost += cost
+        return output
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-phase usage report, including the provider and model used."""
+        with self._lock:
+            return {
+                phase: {
+                    "provider": type(self.routes[phase].llm).__name__,
+                    "model": self.routes[phase].llm.model_name,
+                    **self._stats[phase].to_dict(),
+                }
+                for phase in PHASES
+            }
+
+    @staticmethod
+    def combined_stats(routers: List["LLMRouter"]) -> Dict[str, Dict[str, Any]]:
+        """Per-phase usage summed over several routers (e.g. the runs of a batch)."""
+        totals = {phase: PhaseStats() for phase in PHASES}
+        for router in routers:
+            with router._lock:
+                for phase, stats in router._stats.items():
+                    total = totals[phase]
+                    total.calls += stats.calls
+                    total.latency_s += stats.latency_s
+                    total.input_tokens += stats.input_tokens
+                    total.output_tokens += stats.output_tokens
+                    total.cost += stats.cost
+        return {phase: totals[phase].to_dict() for phase in PHASES}
@@ -6,11 +6,14 @@ from typing import Optional
 
 from mistralai import Mistral
 
+from app.backend.core.agent.cancellation import CancelToken
 from app.backend.core.agent.llm import LLM
 from app.backend.core.models.prompt import SYSTEM_PROMPT
 
 
 class MistralLLM(LLM):
+    provider = "mistral"
+
     def __init__(self, model_name: str):
         super().__init__(model_name)
 
@@ -31,17 +34,23 @@ class MistralLLM(LLM):
         """
         return False
 
-    def generate(self, user_input: str, system_prompt: Optional[str] = None) -> str:
+    def generate(
+        self, user_input: str, system_prompt: Optional[str] = None, cancel_token: Optional[CancelToken] = None
+    ) -> str:
         """
         Send a message to the Mistral model and return the generated text
         (expected to be a JSON string that follows the Agent schema).
         """
         system_prompt = system_prompt or self._compose_system_prompt(SYSTEM_PROMPT)
-        resp = self.client.chat.complete(
-            model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_input},
-            ],
-        )
-        return resp.choices[0].message.content
+
+        def request() -> str:
+            resp = self.client.chat.complete(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_input},
+                ],
+            )
+            return resp.choices[0].message.content
+
+        return self._call_provider(request, system_prompt + user_input, cancel_token)
@@ -1,22 +1,95 @@
 from __future__ import annotations
 
-from typing import Optional
-from ollama import chat, ChatResponse
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
 
+from ollama import Client, ChatResponse
+
+from app.backend.core.agent import cancellation
+from app.backend.core.agent.cancellation import CancelToken, RunCancelled
 from app.backend.core.agent.llm import LLM
 from app.backend.core.models.prompt import SYSTEM_PROMPT
 
 
+# Clients and request semaphores are shared by every OllamaLLM pointing at the
+# same server, so that connections stay open between /run requests and the
+# concurrency bound applies process-wide rather than per agent run.
+_CLIENTS: Dict[Optional[str], Client] = {}
+_SEMAPHORES: Dict[Tuple[Optional[str], int], threading.BoundedSemaphore] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _env_keep_alive() -> Optional[Union[float, str]]:
+    value = os.getenv("OLLAMA_KEEP_ALIVE")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _shared_client(host: Optional[str]) -> Client:
+    with _SHARED_LOCK:
+        client = _CLIENTS.get(host)
+        if client is None:
+            client = Client(host=host)
+            _CLIENTS[host] = client
+        return client
+
+
+def _shared_semaphore(host: Optional[str], size: int) -> threading.BoundedSemaphore:
+    with _SHARED_LOCK:
+        key = (host, size)
+        semaphore = _SEMAPHORES.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(size)
+            _SEMAPHORES[key] = semaphore
+        return semaphore
+
+
 class OllamaLLM(LLM):
-    def __init__(self, model_name: str):
+    provider = "ollama"
+
+    def __init__(
+        self,
+        model_name: str,
+        host: Optional[str] = None,
+        keep_alive: Optional[Union[float, str]] = None,
+        num_ctx: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            model_name: The Ollama model tag (e.g. "gemma3:12b").
+            host: URL of the Ollama server. Defaults to OLLAMA_HOST.
+            keep_alive: How long the server keeps the model loaded after a
+                request (e.g. "30m", or -1 to keep it resident). Defaults to
+                OLLAMA_KEEP_ALIVE.
+            num_ctx: Context window size passed in the request options.
+                Defaults to OLLAMA_NUM_CTX, or the server default if unset.
+            max_concurrency: Maximum number of in-flight requests to the
+                server. Defaults to OLLAMA_MAX_CONCURRENCY, or 1.
+        """
+        self.host = host or os.getenv("OLLAMA_HOST") or None
+        self.keep_alive = keep_alive if keep_alive is not None else _env_keep_alive()
+        self.num_ctx = num_ctx if num_ctx is not None else _env_int("OLLAMA_NUM_CTX")
+        self.max_concurrency = max_concurrency or _env_int("OLLAMA_MAX_CONCURRENCY") or 1
+        self._semaphore = _shared_semaphore(self.host, self.max_concurrency)
         super().__init__(model_name)
 
     def init_client(self):
         """
-        Ollama doesn't require explicit client initialization.
-        Just ensure the local Ollama server is running.
+        Return the shared Ollama client for the configured host.
+        The local Ollama server must be running.
         """
-        return None
+        return _shared_client(self.host)
 
     def has_native_tool_calling(self) -> bool:
         """
@@ -25,7 +98,30 @@ class OllamaLLM(LLM):
         """
         return False
 
-    def generate(self, user_input: str, system_prompt: Optional[str] = None) -> str:
+    def _options(self) -> Optional[Dict[str, Any]]:
+        if self.num_ctx is None:
+            return None
+        return {"num_ctx": self.num_ctx}
+
+    def warm_up(self) -> None:
+        """
+        Load the model into server memory without generating any tokens,
+        so that the first real request does not pay for a cold load.
+        """
+        try:
+            with self._semaphore:
+                self.client.chat(
+                    model=self.model_name,
+                    messages=[],
+                    options=self._options(),
+                    keep_alive=self.keep_alive,
+                )
+        except Exception as e:
+            raise RuntimeError(f"Ollama warm-up failed: {e}")
+
+    def generate(
+        self, user_input: str, system_prompt: Optional[str] = None, cancel_token: Optional[CancelToken] = None
+    ) -> str:
         """
         Sends a message to the Ollama model using the official Python API
         and returns the full generated text.
@@ -37,11 +133,22 @@ class OllamaLLM(LLM):
             {"role": "user", "content": user_input},
         ]
 
-        try:
-            response: ChatResponse = chat(
-                model=self.model_name,
-                messages=messages,
-            )
+        def request() -> str:
+            cancellation.acquire(self._semaphore, cancel_token)
+            try:
+                response: ChatResponse = self.client.chat(
+                    model=self.model_name,
+                    messages=messages,
+                    options=self._options(),
+                    keep_alive=self.keep_alive,
+                )
+            finally:
+                self._semaphore.release()
             return response["message"]["content"].strip()
+
+        try:
+            return self._call_provider(request, system_prompt + user_input, cancel_token)
+        except RunCancelled:
+            raise
         except Exception as e:
             raise RuntimeError(f"Ollama generation failed: {e}")
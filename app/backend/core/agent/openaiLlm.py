@@ -5,11 +5,14 @@ from typing import Optional
 
 from openai import OpenAI
 
+from app.backend.core.agent.cancellation import CancelToken
 from app.backend.core.agent.llm import LLM
 from app.backend.core.models.prompt import SYSTEM_PROMPT
 
 
 class OpenAILLM(LLM):
+    provider = "openai"
+
     def __init__(self, model_name: str):
         super().__init__(model_name)
 
@@ -21,7 +24,8 @@ class OpenAILLM(LLM):
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is not set in the environment.")
 
-        client = OpenAI(api_key=api_key)
+        # Retries are handled by LLM._call_provider so they share the rate limiter.
+        client = OpenAI(api_key=api_key, max_retries=0)
         return client
 
     def has_native_tool_calling(self) -> bool:
@@ -31,17 +35,21 @@ class OpenAILLM(LLM):
         """
         return False
 
-    def generate(self, user_input: str, system_prompt: Optional[str] = None) -> str:
+    def generate(
+        self, user_input: str, system_prompt: Optional[str] = None, cancel_token: Optional[CancelToken] = None
+    ) -> str:
         """
         Send a message to the OpenAI model and return the generated text
         (expected to be a JSON string that follows the Agent schema).
         """
         system_prompt = system_prompt or self._compose_system_prompt(SYSTEM_PROMPT)
 
-        response = self.client.responses.create(
-            model=self.model_name,
-            instructions=system_prompt,
-            input=user_input,
-        )
+        def request() -> str:
+            response = self.client.responses.create(
+                model=self.model_name,
+                instructions=system_prompt,
+                input=user_input,
+            )
+            return response.output_text
 
-        return response.output_text
+        return self._call_provider(request, system_prompt + user_input, cancel_token)
@@ -0,0 +1,43 @@
+"""Registry of LLM backends, imported only when selected.
+
+Each provider SDK is heavy to import, and a process only ever uses the ones
+named by LLM_PROVIDER / LLM_ROUTING, so backends are registered by module
+path and loaded on first use.
+"""
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import Dict, Type
+
+from app.backend.core.agent.llm import LLM
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    module: str
+    class_name: str
+    model_env: str
+    default_model: str
+
+
+PROVIDERS: Dict[str, ProviderSpec] = {
+    "openai": ProviderSpec("app.backend.core.agent.openaiLlm", "OpenAILLM", "OPENAI_MODEL", "gpt-4o"),
+    "mistral": ProviderSpec("app.backend.core.agent.mistralLlm", "MistralLLM", "MISTRAL_MODEL", "mistral-medium-2508"),
+    "ollama": ProviderSpec("app.backend.core.agent.ollamaLlm", "OllamaLLM", "OLLAMA_MODEL", "gemma3:12b"),
+}
+
+
+def register_provider(name: str, spec: ProviderSpec) -> None:
+    """Register an additional backend under `name`."""
+    PROVIDERS[name.lower()] = spec
+
+
+def load_provider(name: str) -> Type[LLM]:
+    """Import and return the LLM class registered under `name`."""
+    try:
+        spec = PROVIDERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown LLM provider '{name}'. Available: {', '.join(sorted(PROVIDERS))}") from None
+    module = importlib.import_module(spec.module)
+    return getattr(module, spec.class_name)
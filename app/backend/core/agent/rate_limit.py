@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import email.utils
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from app.backend.core.agent import cancellation
+from app.backend.core.agent.cancellation import CancelToken
+
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`.
+
+    `acquire` blocks until the requested amount is available. `debit`
+    consumes without blocking and may push the balance negative, which is
+    how usage only known after a call (e.g. output tokens) is accounted for.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, cancel_token: Optional[CancelToken] = None) -> float:
+        """Block until `amount` tokens are available; return the time waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            cancellation.sleep(delay, cancel_token)
+            waited += delay
+
+    def debit(self, amount: float) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class RateLimiter:
+    """Requests/min and tokens/min limits for a single provider and model."""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, estimated_tokens: int = 0, cancel_token: Optional[CancelToken] = None) -> None:
+        if self.requests is not None:
+            self.requests.acquire(1, cancel_token)
+        if self.tokens is not None and estimated_tokens:
+            self.tokens.acquire(estimated_tokens, cancel_token)
+
+    def record(self, extra_tokens: int) -> None:
+        """Account for tokens that were not known when `acquire` was called."""
+        if self.tokens is not None and extra_tokens:
+            self.tokens.debit(extra_tokens)
+
+
+_LIMITERS: Dict[Tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model_name: str) -> RateLimiter:
+    """
+    Return the process-wide limiter for `provider` and `model_name`.
+
+    Limits are read from `<PROVIDER>_RPM` and `<PROVIDER>_TPM` (e.g.
+    OPENAI_RPM=500) the first time a model is used. Unset means unlimited.
+    """
+    key = (provider, model_name)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            prefix = provider.upper()
+            limiter = RateLimiter(
+                requests_per_minute=_env_float(f"{prefix}_RPM", None),
+                tokens_per_minute=_env_float(f"{prefix}_TPM", None),
+            )
+            _LIMITERS[key] = limiter
+        return limiter
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None) or getattr(exc, "raw_response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Extract a Retry-After delay (seconds or HTTP date) from a provider error."""
+    response = getattr(exc, "response", None) or getattr(exc, "raw_response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        # Malformed header (e.g. "soon"): fall back to the jittered backoff.
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+# httpx transport errors (used by the ollama, openai and mistral clients) that
+# mean the server was unreachable or dropped the connection. Matched by name
+# so httpx does not have to be imported here. UnsupportedProtocol and the
+# other TransportErrors are configuration errors and are not retried.
+_TRANSIENT_HTTPX_ERRORS = frozenset({"NetworkError", "TimeoutException", "RemoteProtocolError"})
+
+
+def _is_transient_httpx_error(exc: BaseException) -> bool:
+    return any(
+        cls.__module__.startswith("httpx") and cls.__name__ in _TRANSIENT_HTTPX_ERRORS
+        for cls in type(exc).__mro__
+    )
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for throttling, transient server errors and connection failures."""
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)) or _is_transient_httpx_error(exc):
+        return True
+    name = type(exc).__name__
+    return "Connect" in name or "Timeout" in name
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff that honors Retry-After."""
+
+    max_retries: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+            base_delay=_env_float("LLM_RETRY_BASE_DELAY", 0.5),
+            max_delay=_env_float("LLM_RETRY_MAX_DELAY", 30.0),
+        )
+
+    def delay(self, attempt: int, exc: BaseException) -> float:
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        # "Full jitter": spreads retries from concurrent runs over the window.
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn: Callable[[], T], cancel_token: Optional[CancelToken] = None) -> T:
+        attempt = 0
+        while True:
+            cancellation.check(cancel_token)
+            try:
+                return fn()
+            except Exception as exc:
+                if attempt >= self.max_retries or not is_retryable(exc):
+                    raise
+                cancellation.sleep(self.delay(attempt, exc), cancel_token)
+                attempt += 1
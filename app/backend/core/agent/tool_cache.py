@@ -0,0 +1,83 @@
+"""Tool-result cache shared by the agent runs of a batch."""
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result and len(result) == 1
+
+
+class ToolResultCache:
+    """
+    Bounded LRU cache of tool results keyed by tool name and arguments.
+
+    Concurrent calls with the same key are coalesced: the first one runs the
+    tool and the others wait for its result. Error results (`{"error": ...}`)
+    are returned to the waiting callers but not kept, so a transient failure
+    is retried by the next run.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+        return name, json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_run(self, name: str, args: Dict[str, Any], run: Callable[[], Any]) -> Any:
+        """Return the cached result for (`name`, `args`), calling `run` on a miss."""
+        key = self.key(name, args)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            pending = self._in_flight.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._in_flight[key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            result = run()
+        except BaseException as exc:
+            with self._lock:
+                del self._in_flight[key]
+            pending.set_exception(exc)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if not _is_error(result):
+                self._entries[key] = result
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        pending.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
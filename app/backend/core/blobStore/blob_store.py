@@ -0,0 +1,191 @@
+"""Content-addressed storage for large tool outputs.
+
+Values are stored once as JSON bytes, keyed by their SHA-256, so the same
+page fetched by several leaves (or several runs) is held once.
+`ToolCall` keeps a `BlobRef` and decodes the content only when it is read.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _round_trips(value: Any) -> bool:
+    """Whether decoding the JSON encoding of `value` gives back an equal value."""
+    kind = type(value)
+    if kind is dict:
+        return all(type(key) is str and _round_trips(item) for key, item in value.items())
+    if kind is list:
+        return all(_round_trips(item) for item in value)
+    if kind is float:
+        return math.isfinite(value)
+    return kind in (str, int, bool, type(None))
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    JSON encoding of `value`, keeping key order. Raises TypeError unless
+    decoding it gives back an equal value: only dicts with string keys,
+    lists, strings, finite floats, ints, bools and None are accepted, so
+    tuples, NaN, non-string keys and other objects are refused rather than
+    converted.
+    """
+    if not _round_trips(value):
+        raise TypeError(f"{type(value).__name__} value does not survive a JSON round trip")
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_value(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class BlobRef:
+    """Handle on a stored blob. In-memory stores keep the bytes on the ref itself."""
+
+    __slots__ = ("digest", "size", "data", "__weakref__")
+
+    def __init__(self, digest: str, size: int, data: Optional[bytes] = None):
+        self.digest = digest
+        self.size = size
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.digest[:12]}, {self.size} bytes)"
+
+
+class BlobStore(ABC):
+    """Content-addressed store of JSON-encoded values."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.puts = 0
+        self.dedup_hits = 0
+
+    @abstractmethod
+    def _put(self, digest: str, data: bytes) -> BlobRef:
+        """Store `data` under `digest` (if absent) and return its ref."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_bytes(self, ref: BlobRef) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def put_bytes(self, data: bytes) -> BlobRef:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.puts += 1
+            return self._put(digest, data)
+
+    def put(self, value: Any) -> BlobRef:
+        return self.put_bytes(encode_value(value))
+
+    def get(self, ref: BlobRef) -> Any:
+        return decode_value(self.get_bytes(ref))
+
+
+class MemoryBlobStore(BlobStore):
+    """
+    In-memory store. Blobs are held only through the refs handed out, so a
+    blob is freed as soon as no tool call references it anymore.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._blobs: "weakref.WeakValueDictionary[str, BlobRef]" = weakref.WeakValueDictionary()
+
+    def _put(self, digest: str, data: bytes) -> BlobRef:
+        ref = self._blobs.get(digest)
+        if ref is not None:
+            self.dedup_hits += 1
+            return ref
+        # Copy into an exactly-sized object: encoders may over-allocate the
+        # buffer they return, and this one lives as long as the tree.
+        ref = BlobRef(digest, len(data), memoryview(data).tobytes())
+        self._blobs[digest] = ref
+        return ref
+
+    def get_bytes(self, ref: BlobRef) -> bytes:
+        return ref.data
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            blobs = list(self._blobs.values())
+            return {
+                "blobs": len(blobs),
+                "bytes": sum(ref.size for ref in blobs),
+                "puts": self.puts,
+                "dedup_hits": self.dedup_hits,
+            }
+
+
+class DiskBlobStore(BlobStore):
+    """
+    On-disk store under `root`, laid out as `<root>/<digest[:2]>/<digest>`.
+    Content is read back from disk on each access, keeping it off the heap.
+    Files are not garbage-collected; the directory acts as a persistent cache.
+    """
+
+    def __init__(self, root: str) -> None:
+        super().__init__()
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.bytes_written = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _put(self, digest: str, data: bytes) -> BlobRef:
+        path = self._path(digest)
+        if path.exists():
+            self.dedup_hits += 1
+        else:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self.bytes_written += len(data)
+        return BlobRef(digest, len(data))
+
+    def get_bytes(self, ref: BlobRef) -> bytes:
+        return self._path(ref.digest).read_bytes()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "bytes_written": self.bytes_written,
+                "puts": self.puts,
+                "dedup_hits": self.dedup_hits,
+            }
+
+
+def _build_default_store() -> BlobStore:
+    root = os.getenv("BLOB_STORE_DIR")
+    return DiskBlobStore(root) if root else MemoryBlobStore()
+
+
+#: Values whose encoding is smaller than this stay inline in the ToolCall.
+INLINE_MAX_BYTES = int(os.getenv("BLOB_INLINE_MAX_BYTES", "1024"))
+
+default_blob_store: BlobStore = _build_default_store()
@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Optional
 
 from app.backend.core.models.tool_calls import ToolCall
 
-@dataclass
+@dataclass(slots=True)
 class LlmLeaf:
     description: str
     tool_calls: List[ToolCall] = field(default_factory=list)
@@ -14,7 +14,26 @@ class LlmLeaf:
             "tool_calls": [tc.to_dict() for tc in self.tool_calls],
         }
 
-@dataclass
+@dataclass(slots=True)
+class PrunedStep:
+    """A planned step skipped because it repeats an existing leaf."""
+
+    description: str
+    parent_leaf: str
+    duplicate_of: str
+    similarity: float
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "description": self.description,
+            "parent_leaf": self.parent_leaf,
+            "duplicate_of": self.duplicate_of,
+            "similarity": round(self.similarity, 3),
+            "tool_calls": self.tool_calls,
+        }
+
+@dataclass(slots=True)
 class Leaf:
     id: str
     description: str
@@ -24,15 +43,22 @@ class Leaf:
     tool_calls: List[ToolCall] = field(default_factory=list)
 
     def __str__(self) -> str:
+        return self.to_context()
+
+    def to_context(self, include_tool_results: bool = True) -> str:
+        """Text form used in prompts; tool outputs can be left out to keep it short."""
         parts = [f"Leaf(id={self.id})", f"desc={self.description}", f"result={self.result}"]
         if self.parent_leaf:
             parts.append(f"parent={self.parent_leaf}")
         if self.child_leaves:
             parts.append(f"children={self.child_leaves}")
         if self.tool_calls:
-            formatted_calls = "; ".join(
-                f"{tc.tool_name}(args={tc.args}, result={tc.result})" for tc in self.tool_calls
-            )
+            if include_tool_results:
+                formatted_calls = "; ".join(
+                    f"{tc.tool_name}(args={tc.args}, result={tc.result})" for tc in self.tool_calls
+                )
+            else:
+                formatted_calls = "; ".join(f"{tc.tool_name}(args={tc.args})" for tc in self.tool_calls)
             parts.append(f"tools=[{formatted_calls}]")
         return " | ".join(parts)
 
@@ -45,3 +71,13 @@ class Leaf:
             "child_leaves": self.child_leaves,
             "tool_calls": [tc.to_dict() for tc in self.tool_calls],
         }
+
+    def to_skeleton(self) -> Dict[str, Any]:
+        """Structure-only view of the leaf, without its result or tool outputs."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "parent_leaf": self.parent_leaf,
+            "child_leaves": self.child_leaves,
+            "tool_names": [tc.tool_name for tc in self.tool_calls],
+        }
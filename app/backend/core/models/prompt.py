@@ -15,6 +15,7 @@ Break down the user's request into clear, well-separated steps when necessary.
 If the request can be split into subproblems, do it. Each subproblem should become a distinct step with its own tool_calls.
 Use parallel steps when multiple independent aspects of the task can be solved at the same time.
 Avoid overthinking trivial requests, but always aim for explainability, transparency and decomposition.
+When the request or a branch can already be answered from the context, return a step with empty tool_calls and a "final" answer: that branch stops there, and if this is your first plan the answer is returned to the user directly.
 
 ---
 
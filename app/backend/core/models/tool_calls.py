@@ -1,19 +1,94 @@
 import json
-from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from app.backend.core.blobStore.blob_store import (
+    INLINE_MAX_BYTES,
+    BlobRef,
+    BlobStore,
+    default_blob_store,
+    encode_value,
+)
+
 
-@dataclass
 class ToolCall:
-    tool_name: str
-    args: Dict[str, Any] = field(default_factory=dict)
-    result: Any = None
+    """
+    A tool invocation and its result.
+
+    Results whose JSON encoding exceeds INLINE_MAX_BYTES are moved to a
+    content-addressed BlobStore: the call keeps only a `BlobRef` and decodes
+    the content when `result` is read, so identical outputs are stored once.
+    Only results that JSON gives back unchanged are moved (see
+    `encode_value`); others, such as tuples or dicts with int keys, stay
+    inline whatever their size, so reading `result` always returns what the
+    tool returned.
+    """
+
+    __slots__ = ("tool_name", "args", "_result", "_result_ref", "_store")
+
+    def __init__(
+        self,
+        tool_name: str,
+        args: Optional[Dict[str, Any]] = None,
+        result: Any = None,
+        store: Optional[BlobStore] = None,
+    ):
+        self.tool_name = tool_name
+        self.args = args if args is not None else {}
+        self._store = store or default_blob_store
+        self._result: Any = None
+        self._result_ref: Optional[BlobRef] = None
+        self.result = result
+
+    @property
+    def result(self) -> Any:
+        if self._result_ref is not None:
+            return self._store.get(self._result_ref)
+        return self._result
+
+    @result.setter
+    def result(self, value: Any) -> None:
+        self._result = None
+        self._result_ref = None
+        if value is None:
+            return
+        try:
+            data = encode_value(value)
+        except TypeError:
+            # JSON would not give it back unchanged: keep the object itself.
+            self._result = value
+            return
+        if len(data) <= INLINE_MAX_BYTES:
+            self._result = value
+        else:
+            self._result_ref = self._store.put_bytes(data)
+
+    @property
+    def result_ref(self) -> Optional[BlobRef]:
+        """Reference to the stored result, or None when it is held inline."""
+        return self._result_ref
+
+    def result_bytes(self) -> Optional[bytes]:
+        """JSON encoding of a stored result, without decoding it."""
+        if self._result_ref is None:
+            return None
+        return self._store.get_bytes(self._result_ref)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ToolCall):
+            return NotImplemented
+        return (self.tool_name, self.args, self.result) == (other.tool_name, other.args, other.result)
+
+    def __repr__(self) -> str:
+        result = self._result_ref if self._result_ref is not None else self._result
+        return f"ToolCall(tool_name={self.tool_name!r}, args={self.args!r}, result={result!r})"
 
     def __str__(self) -> str:
         args_lines = "\n".join(f"  - {k}: {v}" for k, v in self.args.items()) or "  - No arguments"
-        if isinstance(self.result, str):
-            result_text = self.result.strip() or "No result"
+        result = self.result
+        if isinstance(result, str):
+            result_text = result.strip() or "No result"
         else:
-            result_text = json.dumps(self.result, ensure_ascii=False, indent=2)
+            result_text = json.dumps(result, ensure_ascii=False, indent=2)
 
         return (
             f"Tool used: {self.tool_name}\n"
@@ -27,4 +102,3 @@ class ToolCall:
             "args": self.args,
             "result": self.result,
         }
-
@@ -1,7 +1,7 @@
 from typing import Any, Dict, List
 
 from pydantic import BaseModel, Field
-from app.backend.core.models.leaf import Leaf
+from app.backend.core.models.leaf import Leaf, PrunedStep
 from app.backend.core.models.tool_calls import ToolCall
 
 class AddLeafArgs(BaseModel):
@@ -14,6 +14,11 @@ class AddLeafArgs(BaseModel):
 class ReasoningTree:
     def __init__(self, user_input: str) -> None:
         self.leaves: Dict[str, Leaf] = {}
+        # Childless leaves, in insertion order (a dict used as an ordered set).
+        self._frontier: Dict[str, None] = {}
+        self._next_leaf_number = 1
+        # Planned steps that were not expanded, kept for auditing.
+        self.pruned_steps: List[PrunedStep] = []
 
         root_leaf = Leaf(
             id="leaf_0",
@@ -24,6 +29,7 @@ class ReasoningTree:
             result=""
         )
         self.leaves[root_leaf.id] = root_leaf
+        self._frontier[root_leaf.id] = None
 
     def __len__(self):
         return len(self.leaves)
@@ -36,6 +42,15 @@ class ReasoningTree:
     def to_dict(self) -> dict:
         return {leaf_id: leaf.to_dict() for leaf_id, leaf in self.leaves.items()}
 
+    def skeleton(self) -> Dict[str, Dict[str, Any]]:
+        """Ids, parents, children and descriptions of every leaf, without results."""
+        return {leaf_id: leaf.to_skeleton() for leaf_id, leaf in self.leaves.items()}
+
+    def get_children_page(self, leaf_id: str, offset: int = 0, limit: int = 50) -> List[Leaf]:
+        """Return the children of `leaf_id` in creation order, one page at a time."""
+        child_ids = self.leaves[leaf_id].child_leaves[offset:offset + limit]
+        return [self.leaves[child_id] for child_id in child_ids]
+
     def get_branch_depth(self, leaf_id: str) -> int:
         """Return the depth (number of edges) between the root and the leaf."""
         depth = 0
@@ -46,38 +61,52 @@ class ReasoningTree:
         return depth
 
     def add_leaf(self, description: str, parent_leaf: str, tool_calls: List[ToolCall], result: str) -> str:
-        leaf_number = len(self.leaves)
-        new_id = f"leaf_{leaf_number}"
-        while new_id in self.leaves:
-            leaf_number += 1
-            new_id = f"leaf_{leaf_number}"
+        new_id = f"leaf_{self._next_leaf_number}"
+        self._next_leaf_number += 1
 
         new_leaf = Leaf(
             id=new_id, description=description, parent_leaf=parent_leaf,
             tool_calls=tool_calls, child_leaves=[], result=result
         )
         self.leaves[new_id] = new_leaf
+        self._frontier[new_id] = None
         if parent_leaf in self.leaves:
             self.leaves[parent_leaf].child_leaves.append(new_id)
+            self._frontier.pop(parent_leaf, None)
         return new_id
 
 
-    def get_leaf_context(self, leaf_id: str) -> str:
+    def add_pruned_step(
+        self,
+        description: str,
+        parent_leaf: str,
+        tool_calls: List[Dict[str, Any]],
+        duplicate_of: str,
+        similarity: float,
+    ) -> PrunedStep:
+        pruned = PrunedStep(
+            description=description, parent_leaf=parent_leaf, tool_calls=tool_calls,
+            duplicate_of=duplicate_of, similarity=similarity
+        )
+        self.pruned_steps.append(pruned)
+        return pruned
+
+    def get_leaf_context(self, leaf_id: str, include_tool_results: bool = True) -> str:
         if leaf_id not in self.leaves:
             return "Leaf not found."
 
         leaf = self.leaves[leaf_id]
 
         if leaf.parent_leaf is None:
-            return str(leaf)
+            return leaf.to_context(include_tool_results)
 
-        parent_context = self.get_leaf_context(leaf.parent_leaf)
-        return f"{parent_context}\n\n→ {str(leaf)}".strip()
+        parent_context = self.get_leaf_context(leaf.parent_leaf, include_tool_results)
+        return f"{parent_context}\n\n→ {leaf.to_context(include_tool_results)}".strip()
 
     def get_last_leaves(self) -> List[Leaf]:
-        return [leaf for leaf in self.leaves.values() if not leaf.child_leaves]
+        return [self.leaves[leaf_id] for leaf_id in self._frontier]
 
-    def get_reasoning_tree_context(self) -> str:
+    def get_reasoning_tree_context(self, include_tool_results: bool = True) -> str:
         return "\n\n====================\n\n".join(
-            self.get_leaf_context(leaf.id) for leaf in self.get_last_leaves()
+            self.get_leaf_context(leaf.id, include_tool_results) for leaf in self.get_last_leaves()
         )
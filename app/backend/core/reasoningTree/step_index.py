@@ -0,0 +1,136 @@
+"""MinHash/LSH index used to spot planned steps that repeat existing leaves."""
+from __future__ import annotations
+
+import random
+import re
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+
+_TOKEN_RE = re.compile(r"[\w']+")
+
+# Function words plus the verbs planners use interchangeably to open a step
+# ("Search for X", "Look up X", "Find X"), which carry no topical meaning.
+# Directional words ("from", "to", "into") are kept: they distinguish routes.
+STOP_WORDS = frozenset("""
+a an and are as at be by for in is it its of on or over that the their then this up
+using via what when where which who with about across all any each more most some
+search searching look looking find finding fetch fetching get getting retrieve retrieving
+identify identifying gather gathering research researching check checking explore exploring
+read reading collect collecting lookup query information info details
+""".split())
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _normalize(token: str) -> str:
+    """Cheap plural folding so "hotels" and "hotel" match."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _tokens(text: str) -> List[str]:
+    return [_normalize(token) for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def text_features(text: str) -> Set[str]:
+    """
+    Word shingles of `text`: its unigrams plus its bigrams, so that two
+    steps with the same words in a different order ("Madrid to Paris" and
+    "Paris to Madrid") do not look identical.
+    """
+    tokens = _tokens(text)
+    features = set(tokens)
+    features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return features
+
+
+def tool_features(tool_calls: Iterable[Dict[str, Any]]) -> Set[str]:
+    """
+    Features of planned tool calls. URLs are kept whole so that two fetches
+    of different pages on the same site never look alike; other argument
+    values are shingled like descriptions.
+    """
+    features: Set[str] = set()
+    for call in tool_calls:
+        name = call.get("tool_name", "")
+        features.add(f"tool:{name}")
+        for key, value in (call.get("args") or {}).items():
+            value = str(value).strip()
+            if value.startswith(("http://", "https://")):
+                features.add(f"{name}.{key}={value.rstrip('/').lower()}")
+            else:
+                features.update(f"{name}.{key}:{token}" for token in text_features(value))
+    return features
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class StepIndex:
+    """
+    Index of reasoning steps for near-duplicate lookup.
+
+    Candidates come from MinHash signatures of the description features,
+    split into LSH bands; only candidates sharing a band are compared
+    exactly. A step is a duplicate when both its description and its tool
+    calls reach `threshold` Jaccard similarity with an indexed step.
+    """
+
+    def __init__(self, threshold: float = 0.7, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._entries: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _signature(self, features: FrozenSet[str]) -> List[int]:
+        hashes = [hash(feature) & _MAX_HASH for feature in features] or [0]
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, ...]]:
+        return [tuple(signature[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+
+    def add(self, step_id: str, description: str, tool_calls: Iterable[Dict[str, Any]]) -> None:
+        desc = frozenset(text_features(description))
+        tools = frozenset(tool_features(tool_calls))
+        self._entries[step_id] = (desc, tools)
+        for bucket, key in zip(self._buckets, self._band_keys(self._signature(desc))):
+            bucket[key].append(step_id)
+
+    def find_duplicate(
+        self, description: str, tool_calls: Iterable[Dict[str, Any]]
+    ) -> Optional[Tuple[str, float]]:
+        """Return (step_id, similarity) of the closest duplicate, if any."""
+        desc = frozenset(text_features(description))
+        if not desc:
+            return None
+        tools = frozenset(tool_features(tool_calls))
+        candidates: Set[str] = set()
+        for bucket, key in zip(self._buckets, self._band_keys(self._signature(desc))):
+            candidates.update(bucket.get(key, ()))
+
+        best: Optional[Tuple[str, float]] = None
+        for step_id in candidates:
+            other_desc, other_tools = self._entries[step_id]
+            similarity = min(jaccard(desc, other_desc), jaccard(tools, other_tools))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (step_id, similarity)
+        return best
@@ -0,0 +1,158 @@
+"""Per-run BM25 index over the content returned by tools."""
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def chunk_text(text: str, max_chars: int = 800) -> List[str]:
+    """Split text into chunks of at most ~`max_chars`, on line boundaries when possible."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:cut])
+            line = line[cut:].strip()
+        if size + len(line) > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def result_documents(tool_name: str, args: Dict[str, Any], result: Any) -> List[Tuple[str, str]]:
+    """
+    Turn a tool result into (text, source) documents to index.
+
+    `fetch_url` pages become one document; each `web_search` hit becomes its
+    own document. Errors are not indexed.
+    """
+    if isinstance(result, dict):
+        if "error" in result and len(result) == 1:
+            return []
+        if isinstance(result.get("text"), str):
+            return [(result["text"], str(args.get("url", tool_name)))]
+        if isinstance(result.get("results"), list):
+            docs = []
+            for hit in result["results"]:
+                if isinstance(hit, dict):
+                    text = "\n".join(str(hit.get(key, "")) for key in ("title", "snippet") if hit.get(key))
+                    docs.append((text, str(hit.get("url", tool_name))))
+            return docs
+    if isinstance(result, str):
+        return [(result, tool_name)]
+    return [(json.dumps(result, ensure_ascii=False), tool_name)]
+
+
+@dataclass(slots=True)
+class Chunk:
+    id: int
+    text: str
+    source: str
+    group: str
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring.
+
+    Chunks are tagged with a `group` (e.g. the step that produced them) so
+    that a query can be restricted to one step's evidence.
+    """
+
+    def __init__(self, chunk_chars: int = 800, k1: float = 1.2, b: float = 0.75):
+        self.chunk_chars = chunk_chars
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[Chunk] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._groups: Dict[str, List[int]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def add_document(self, text: str, source: str, group: str = "") -> int:
+        """Chunk and index `text`; return the number of chunks added."""
+        pieces = chunk_text(text, self.chunk_chars)
+        with self._lock:
+            for piece in pieces:
+                chunk_id = len(self.chunks)
+                self.chunks.append(Chunk(chunk_id, piece, source, group))
+                self._groups[group].append(chunk_id)
+                counts: Dict[str, int] = defaultdict(int)
+                tokens = tokenize(piece)
+                for token in tokens:
+                    counts[token] += 1
+                for token, tf in counts.items():
+                    self._postings[token].append((chunk_id, tf))
+                self._lengths.append(len(tokens))
+                self._total_length += len(tokens)
+        return len(pieces)
+
+    def add_tool_result(self, tool_name: str, args: Dict[str, Any], result: Any, group: str = "") -> int:
+        return sum(
+            self.add_document(text, source, group)
+            for text, source in result_documents(tool_name, args, result)
+        )
+
+    def search(self, query: str, k: int = 5, groups: Optional[Iterable[str]] = None) -> List[Chunk]:
+        """Return the `k` best chunks for `query`, optionally only from `groups`."""
+        allowed: Optional[Set[int]] = None
+        if groups is not None:
+            allowed = {chunk_id for group in groups for chunk_id in self._groups.get(group, ())}
+            if not allowed:
+                return []
+        with self._lock:
+            n_chunks = len(self.chunks)
+            if not n_chunks:
+                return []
+            avg_length = self._total_length / n_chunks
+            scores: Dict[int, float] = defaultdict(float)
+            for token in set(tokenize(query)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_chunks - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings:
+                    if allowed is not None and chunk_id not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [self.chunks[chunk_id] for chunk_id, _ in best]
+
+
+def format_chunks(chunks: List[Chunk]) -> str:
+    return "\n\n".join(f"[{chunk.source}]\n{chunk.text}" for chunk in chunks)
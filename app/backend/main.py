@@ -1,8 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-from app.backend.api.agent import router as agent_router
+from app.backend.api.agent import router as agent_router, warm_up_llm
+from app.backend.api.responses import install_compression
+from app.backend.api.tools import html_pool
+from app.backend.api.tools.web import prefetcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(warm_up_llm)
+    yield
+    prefetcher.shutdown()
+    html_pool.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -10,6 +24,7 @@ def create_app() -> FastAPI:
         title="Deep Research Agent API",
         description="Backend API to run the autonomous reasoning agent",
         version="1.0.0",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -20,6 +35,8 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    install_compression(app)
+
     app.include_router(agent_router, prefix="/api/agent")
 
     @app.get("/")
@@ -2,6 +2,8 @@ import { el } from '../ui/dom.js';
 import { escHTML, pretty, safeToolText } from '../core/utils.js';
 import { buildLayout, withRootRecursive, edgePath } from './layout.js';
 import { drawMinimap } from './minimap.js';
+import { loadNodeDetails } from '../data/backend.js';
+import { toast } from '../ui/toast.js';
 
 export function render(state) {
   if (!state?.nodes || Object.keys(state.nodes).length === 0) {
@@ -78,7 +80,7 @@ export function render(state) {
       <div class="tool">
         <div class="tool-name">🧩 ${escHTML(t.tool_name)}</div>
         <div class="tool-result">${safeToolText(
-          t.result ?? '(no result)',
+          t.result ?? (n.loaded === false ? '…' : '(no result)'),
           220
         )}</div>
       </div>`
@@ -105,7 +107,15 @@ export function render(state) {
       for (const d of n.depends_on || [])
         edgeIndex.get(`${id}<-${d}`)?.classList.remove('active');
     });
-    div.addEventListener('click', () => {
+    div.addEventListener('click', async () => {
+      try {
+        if (!n.loaded) {
+          await loadNodeDetails(n);
+          div.querySelector('.desc').textContent = n.description;
+        }
+      } catch (e) {
+        toast('Unable to load node: ' + (e?.message || e));
+      }
       import('../ui/inspector.js').then((m) => m.openInspectorRich(n));
     });
 
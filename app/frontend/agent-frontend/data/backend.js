@@ -1,17 +1,19 @@
 import { el } from '../ui/dom.js';
 import { toast } from '../ui/toast.js';
 
+function apiBase() {
+  return (el.apiBase?.value || 'http://localhost:8000').replace(/\/$/, '');
+}
+
 export async function runAgent() {
-  const base = (el.apiBase?.value || 'http://localhost:8000').replace(
-    /\/$/,
-    ''
-  );
+  const base = apiBase();
   const query = (el.query?.value || '').trim();
 
   el.status.textContent = 'Running…';
   toast('Running agent…');
 
-  const res = await fetch(`${base}/api/agent/run`, {
+  // Only the tree skeleton is returned; leaf details are loaded on click.
+  const res = await fetch(`${base}/api/agent/run?lazy=true`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ query }),
@@ -19,3 +21,23 @@ export async function runAgent() {
   if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
   return res.json();
 }
+
+export async function fetchLeaf(runId, leafId) {
+  const res = await fetch(
+    `${apiBase()}/api/agent/runs/${encodeURIComponent(
+      runId
+    )}/leaves/${encodeURIComponent(leafId)}`
+  );
+  if (!res.ok) throw new Error(`${res.status} ${res.statusText}`);
+  return res.json();
+}
+
+// Fill a skeleton node with its result and tool calls, once.
+export async function loadNodeDetails(node) {
+  if (!node.runId || node.loaded) return node;
+  const leaf = await fetchLeaf(node.runId, node.id);
+  node.description = leaf.result || '(no result)';
+  node.tool_calls = leaf.tool_calls || [];
+  node.loaded = true;
+  return node;
+}
@@ -231,20 +231,29 @@ async function runAgent() {
 
     const nodes = {};
     for (const [leafId, leaf] of Object.entries(leaves)) {
+      // Skeleton leaves carry tool names only; results are fetched on click.
+      const lazy = !('result' in leaf);
       nodes[leafId] = {
         id: leaf.id,
         name: (leaf.title || leaf.description || 'Untitled').slice(0, 60),
-        description: leaf.result || leaf.summary || '(no result)',
+        description: lazy
+          ? 'Click to load result'
+          : leaf.result || leaf.summary || '(no result)',
         depends_on: leaf.parent_leaf ? [leaf.parent_leaf] : [],
         status: leaf.status || 'done',
-        tool_calls: leaf.tool_calls || [],
+        tool_calls:
+          leaf.tool_calls ||
+          (leaf.tool_names || []).map((tool_name) => ({ tool_name })),
         parent: leaf.parent_leaf,
         children: leaf.child_leaves,
+        runId: lazy ? data.run_id : undefined,
+        loaded: !lazy,
       };
     }
-    const finalAnswer = Object.values(leaves).find(
-      (l) => l.description === 'Final answer'
-    )?.result;
+    const finalAnswer =
+      data.final_answer ??
+      Object.values(leaves).find((l) => l.description === 'Final answer')
+        ?.result;
 
     // historique
     const card = document.createElement('div');
@@ -0,0 +1,88 @@
+"""Throughput of /run/batch against one /run request per query.
+
+Uses the fake provider and web tools of `fake_backend`, so the numbers
+reflect scheduling and caching rather than network speed. Every
+query plans one shared step (same web_search for all queries) and one
+query-specific step.
+
+Usage:
+    python -m benchmarks.bench_batch [--queries 20] [--concurrency 8] [--llm-ms 40] [--tool-ms 80] [--port 8765]
+"""
+import argparse
+import json
+import threading
+import time
+
+from benchmarks import fake_backend
+
+
+def _company_plan(context: str) -> list:
+    if "Market overview" in context:
+        return []
+    company = context.rsplit("Company ", 1)[-1].split()[0]
+    return [
+        {"description": "Market overview of the sector",
+         "tool_calls": [{"tool_name": "web_search", "args": {"query": "sector market overview 2025"}}]},
+        {"description": f"Market overview of company {company}",
+         "tool_calls": [{"tool_name": "web_search", "args": {"query": f"company {company} revenue"}}]},
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-ms", type=float, default=40)
+    parser.add_argument("--tool-ms", type=float, default=80)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    fake_backend.install(args.llm_ms, args.tool_ms, plan=_company_plan)
+
+    import httpx
+    import uvicorn
+
+    from app.backend.main import app
+
+    queries = [f"Research Company C{i} and its market" for i in range(args.queries)]
+
+    # A real server rather than TestClient, which buffers streamed bodies.
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=600) as client:
+        tools_before = fake_backend.tool_runs
+        start = time.perf_counter()
+        for query in queries:
+            client.post("/api/agent/run", json={"query": query}).raise_for_status()
+        single_s = time.perf_counter() - start
+        single_tools = fake_backend.tool_runs - tools_before
+
+        tools_before = fake_backend.tool_runs
+        start = time.perf_counter()
+        first_result_s = None
+        with client.stream(
+            "POST", "/api/agent/run/batch", json={"queries": queries, "concurrency": args.concurrency}
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                item = json.loads(line)
+                if first_result_s is None:
+                    first_result_s = time.perf_counter() - start
+                if item["type"] == "error":
+                    raise SystemExit(f"batch query failed: {item['error']}")
+        batch_s = time.perf_counter() - start
+        batch_tools = fake_backend.tool_runs - tools_before
+    server.should_exit = True
+
+    print(f"{args.queries} queries, LLM {args.llm_ms:.0f} ms/call, tools {args.tool_ms:.0f} ms/call")
+    print(f"one /run per query:     {single_s:6.2f} s  {args.queries / single_s * 60:7.1f} queries/min  "
+          f"{single_tools} tool runs")
+    print(f"/run/batch (conc. {args.concurrency:>2}):  {batch_s:6.2f} s  {args.queries / batch_s * 60:7.1f} queries/min  "
+          f"{batch_tools} tool runs, first result after {first_result_s:.2f} s")
+    print(f"summary: {json.dumps({k: item[k] for k in ('succeeded', 'queries_per_min', 'tool_cache')})}")
+
+
+if __name__ == "__main__":
+    main()
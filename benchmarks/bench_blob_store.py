@@ -0,0 +1,74 @@
+"""Memory held by a tree whose branches fetch the same pages repeatedly.
+
+Each page result is produced `--repeats` times, as separate dicts (as a tool
+would return them), and attached to different leaves. Compares inline
+results with the content-addressed blob store.
+
+Usage:
+    python -m benchmarks.bench_blob_store [--pages 300] [--repeats 3] [--result-kb 10]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from app.backend.core.blobStore.blob_store import MemoryBlobStore
+from app.backend.core.models.tool_calls import ToolCall
+from app.backend.core.reasoningTree.reasoning_tree import ReasoningTree
+from benchmarks.bench_tree import _LegacyToolCall
+
+
+def _pages(n_pages: int, result_kb: int):
+    rng = random.Random(0)
+    vocabulary = "madrid hotel flight budget museum prado café señor route price night train".split()
+    return [
+        " ".join(rng.choice(vocabulary) for _ in range(result_kb * 180))[: result_kb * 1024]
+        for _ in range(n_pages)
+    ]
+
+
+def _measure(label: str, make_call, pages, repeats: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = ReasoningTree("benchmark query")
+    for r in range(repeats):
+        for i, page in enumerate(pages):
+            # A fresh dict per call, like a tool returning a new result each time.
+            call = make_call({"text": "".join(page)}, i)
+            tree.add_leaf(description=f"Read page {i} ({r})", parent_leaf="leaf_0", tool_calls=[call], result="ok")
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<7} memory={current / 1024:>9.1f} KiB  build={elapsed * 1000:>7.1f} ms")
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--result-kb", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = _pages(args.pages, args.result_kb)
+    inline = _measure(
+        "inline",
+        lambda result, i: _LegacyToolCall("fetch_url", {"url": f"https://example.com/{i}"}, result),
+        pages,
+        args.repeats,
+    )
+    store = MemoryBlobStore()
+    blobs = _measure(
+        "blobs",
+        lambda result, i: ToolCall("fetch_url", {"url": f"https://example.com/{i}"}, result, store=store),
+        pages,
+        args.repeats,
+    )
+    print(f"store: {store.stats()}")
+    print(f"memory saved: {(inline - blobs) / 1024:.1f} KiB ({(1 - blobs / inline) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Index/query cost of the per-run BM25 evidence index and prompt size savings.
+
+Indexes synthetic fetched pages, each with one planted fact, then queries
+for every fact and checks that it is among the top-k chunks.
+
+Usage:
+    python -m benchmarks.bench_bm25 [--pages 300] [--page-chars 10000] [--top-k 5]
+"""
+import argparse
+import random
+import time
+
+from app.backend.core.retrieval.bm25_index import BM25Index, format_chunks
+
+
+VOCABULARY = (
+    "madrid hotel flight budget museum prado cafe route price night train station ticket "
+    "district park palace market tapas weather season airport metro tour guide review"
+).split()
+
+
+def _page(rng: random.Random, chars: int, fact: str) -> str:
+    lines = []
+    while sum(len(line) + 1 for line in lines) < chars:
+        lines.append(" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(8, 20))).capitalize() + ".")
+    lines.insert(rng.randrange(len(lines)), fact)
+    return "\n".join(lines)[:chars + len(fact)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--page-chars", type=int, default=10_000)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    facts = [(f"exhibit{i}", f"The exhibit{i} gallery opens at {8 + i % 4} am on weekdays.") for i in range(args.pages)]
+    pages = [_page(rng, args.page_chars, fact) for _, fact in facts]
+
+    index = BM25Index()
+    start = time.perf_counter()
+    for i, page in enumerate(pages):
+        index.add_tool_result("fetch_url", {"url": f"https://example.com/{i}"}, {"text": page}, group=f"step_{i}")
+    index_s = time.perf_counter() - start
+
+    hits = 0
+    prompt_chars = 0
+    start = time.perf_counter()
+    for i, (term, fact) in enumerate(facts):
+        chunks = index.search(f"When does the {term} gallery open", k=args.top_k, groups=[f"step_{i}"])
+        hits += any(fact in chunk.text for chunk in chunks)
+        prompt_chars += len(format_chunks(chunks))
+    query_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for term, _ in facts:
+        index.search(f"When does the {term} gallery open", k=args.top_k)
+    global_query_s = time.perf_counter() - start
+
+    full_chars = sum(len(page) for page in pages)
+    print(f"indexed {len(pages)} pages -> {len(index)} chunks in {index_s * 1000:.1f} ms "
+          f"({len(pages) * args.page_chars / index_s / 1e6:.1f} M chars/s)")
+    print(f"step query  (one page):  {query_s / len(facts) * 1e6:8.1f} us/query")
+    print(f"run query   (all pages): {global_query_s / len(facts) * 1e6:8.1f} us/query")
+    print(f"planted fact recall@{args.top_k}: {hits}/{len(facts)}")
+    print(f"synthesis evidence: {prompt_chars / len(facts):.0f} chars/step vs {full_chars / len(facts):.0f} chars of raw page")
+
+
+if __name__ == "__main__":
+    main()
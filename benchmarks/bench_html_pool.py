@@ -0,0 +1,88 @@
+"""Throughput of concurrent fetch_url calls with and without the HTML process pool.
+
+Serves a synthetic page from a local HTTP server and runs many fetches at
+once from a thread pool, as concurrent tool calls would.
+
+Usage:
+    python -m benchmarks.bench_html_pool [--fetches 64] [--concurrency 16] [--page-kb 300] [--workers 4]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _serve(page: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _page(kb: int) -> bytes:
+    rows = []
+    i = 0
+    while sum(len(r) for r in rows) < kb * 1024:
+        rows.append(f"<div class='c'><h3>Item {i}</h3><p>Madrid <b>hotel</b> review {i}, <a href='/x{i}'>link</a></p></div>")
+        i += 1
+    return ("<html><body>" + "".join(rows) + "</body></html>").encode()
+
+
+def _run(args) -> None:
+    from app.backend.api.tools import html_pool
+    from app.backend.api.tools.web import FetchURLArgs, fetch_url
+
+    server = _serve(_page(args.page_kb))
+    url = f"http://127.0.0.1:{server.server_port}/"
+    fetch_url(FetchURLArgs(url=url))  # warm up (and start pool workers)
+    if html_pool.POOL_WORKERS:
+        with ThreadPoolExecutor(html_pool.POOL_WORKERS * 2) as warm:
+            list(warm.map(lambda _: fetch_url(FetchURLArgs(url=url)), range(html_pool.POOL_WORKERS * 2)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        results = list(executor.map(lambda _: fetch_url(FetchURLArgs(url=url)), range(args.fetches)))
+    elapsed = time.perf_counter() - start
+    assert all("text" in r for r in results), results[0]
+    html_pool.shutdown()
+    server.shutdown()
+    label = f"pool x{html_pool.POOL_WORKERS}" if html_pool.POOL_WORKERS else "inline"
+    print(f"{label:<8} {args.fetches} fetches of {args.page_kb} KiB at concurrency {args.concurrency}: "
+          f"{elapsed:.2f} s, {args.fetches / elapsed:.1f} fetches/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fetches", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-kb", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _run(args)
+        return
+    # The pool is configured from the environment at import time, so each
+    # configuration runs in its own interpreter.
+    for workers in (0, args.workers):
+        env = dict(os.environ, HTML_POOL_WORKERS=str(workers))
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_html_pool", "--child", *sys.argv[1:]], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
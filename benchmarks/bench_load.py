@@ -0,0 +1,223 @@
+"""HTTP load test of POST /api/agent/run against the real app with fake backends.
+
+Starts the API in a subprocess with the fake LLM provider and web tools of
+`fake_backend` (fixed latencies, no network), then sends requests either
+from a fixed number of concurrent clients (closed loop) or at a fixed
+arrival rate (open loop; latency is measured from the scheduled send time,
+so a stalled server is not hidden by clients waiting on it). The server
+samples its event-loop lag while under load.
+
+Reports throughput, p50/p95/p99 latency, error rate and event-loop lag.
+
+Usage:
+    python -m benchmarks.bench_load [--concurrency 16 | --rate 10] [--duration 20]
+        [--llm-ms 50] [--tool-ms 50] [--breadth 2] [--depth 1] [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+LAG_INTERVAL_S = 0.02
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+class LagMonitor:
+    """Measures how late the event loop wakes up from short sleeps."""
+
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_INTERVAL_S)
+            self.samples.append(max(0.0, loop.time() - start - LAG_INTERVAL_S))
+
+    def report(self, reset: bool) -> Dict[str, float]:
+        samples = sorted(self.samples)
+        if reset:
+            self.samples = []
+        return {
+            "samples": len(samples),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+            "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2) if samples else 0.0,
+        }
+
+
+def serve(args) -> None:
+    """Subprocess entry point: the real app on the fake backends, plus a lag endpoint."""
+    from benchmarks import fake_backend
+
+    fake_backend.install(args.llm_ms, args.tool_ms, args.breadth, args.depth)
+
+    import uvicorn
+
+    from app.backend.main import app
+
+    monitor = LagMonitor()
+
+    async def lag(reset: bool = False):
+        return monitor.report(reset)
+
+    app.add_api_route("/_load/lag", lag, methods=["GET"])
+
+    async def main() -> None:
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+        task = asyncio.create_task(monitor.run())
+        await server.serve()
+        task.cancel()
+
+    asyncio.run(main())
+
+
+async def _send(client, index: int, scheduled: float, results: List[Dict[str, Any]]) -> None:
+    try:
+        response = await client.post("/api/agent/run", json={"query": f"Load test query {index}"})
+        ok = response.status_code == 200
+        error = None if ok else f"HTTP {response.status_code}"
+    except Exception as exc:
+        ok, error = False, type(exc).__name__
+    results.append({"ok": ok, "error": error, "latency": time.perf_counter() - scheduled})
+
+
+async def _closed_loop(client, concurrency: int, deadline: float, results: List[Dict[str, Any]]) -> None:
+    counter = iter(range(10 ** 9))
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            await _send(client, next(counter), time.perf_counter(), results)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _open_loop(client, rate: float, poisson: bool, deadline: float, results: List[Dict[str, Any]]) -> None:
+    tasks = []
+    next_send = time.perf_counter()
+    index = 0
+    while next_send < deadline:
+        await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+        tasks.append(asyncio.create_task(_send(client, index, next_send, results)))
+        index += 1
+        next_send += random.expovariate(rate) if poisson else 1 / rate
+    await asyncio.gather(*tasks)
+
+
+async def drive(args) -> Dict[str, Any]:
+    import httpx
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for _ in range(100):
+            try:
+                await client.get("/")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        else:
+            raise SystemExit("server did not start")
+
+        await asyncio.gather(*(_send(client, -i, time.perf_counter(), []) for i in range(1, 3)))
+        await client.get("/_load/lag", params={"reset": True})
+
+        results: List[Dict[str, Any]] = []
+        start = time.perf_counter()
+        deadline = start + args.duration
+        if args.rate:
+            await _open_loop(client, args.rate, args.poisson, deadline, results)
+        else:
+            await _closed_loop(client, args.concurrency, deadline, results)
+        elapsed = time.perf_counter() - start
+        lag = (await client.get("/_load/lag", params={"reset": True})).json()
+
+    latencies = sorted(result["latency"] for result in results if result["ok"])
+    errors: Dict[str, int] = {}
+    for result in results:
+        if not result["ok"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+    return {
+        "mode": f"rate {args.rate}/s{' (poisson)' if args.poisson else ''}" if args.rate
+                else f"concurrency {args.concurrency}",
+        "duration_s": round(elapsed, 2),
+        "requests": len(results),
+        "ok": len(latencies),
+        "error_rate": round(1 - len(latencies) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            name: round(_percentile(latencies, pct) * 1000, 1)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "event_loop_lag": lag,
+    }
+
+
+def _print_report(report: Dict[str, Any], args) -> None:
+    print(f"{report['mode']}, {report['duration_s']} s; fake LLM {args.llm_ms:.0f} ms, "
+          f"tools {args.tool_ms:.0f} ms, tree {args.breadth}x{args.depth}")
+    print(f"requests: {report['requests']} ({report['ok']} ok), error rate {report['error_rate']:.2%}"
+          + (f" {report['errors']}" if report["errors"] else ""))
+    print(f"throughput: {report['throughput_rps']} req/s")
+    latency = report["latency_ms"]
+    print(f"latency ms: p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    lag = report["event_loop_lag"]
+    print(f"event-loop lag ms: mean {lag['mean_ms']}  p99 {lag['p99_ms']}  max {lag['max_ms']}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=16, help="closed loop: clients sending back-to-back")
+    load.add_argument("--rate", type=float, help="open loop: requests per second")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times with --rate")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--llm-ms", type=float, default=50)
+    parser.add_argument("--tool-ms", type=float, default=50)
+    parser.add_argument("--breadth", type=int, default=2, help="steps per plan")
+    parser.add_argument("--depth", type=int, default=1, help="maximum branch depth")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return
+
+    server_argv = [
+        sys.executable, "-m", "benchmarks.bench_load", "--serve", "--port", str(args.port),
+        "--llm-ms", str(args.llm_ms), "--tool-ms", str(args.tool_ms),
+        "--breadth", str(args.breadth), "--depth", str(args.depth),
+    ]
+    server = subprocess.Popen(server_argv, env=os.environ.copy())
+    try:
+        report = asyncio.run(drive(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        _print_report(report, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Warm-up, keep-alive and concurrency of OllamaLLM against a stand-in server.
+
+Serves `/api/chat` from a local HTTP server that behaves like Ollama for
+what OllamaLLM relies on: the first request for a model (or for the same
+model with a different num_ctx, or after its keep_alive has expired) pays
+a load delay before the first token, and a request with no messages only
+loads the model. The server records every request body and the largest
+number of requests it had in flight at once.
+
+Checks that warm_up() sends `messages=[]` with the configured keep_alive
+and num_ctx, that the first generate() after a warm-up does not pay the
+load delay, and that concurrent generate() calls never put more than
+OLLAMA_MAX_CONCURRENCY requests in flight. Exits non-zero if any check fails.
+
+Usage:
+    python -m benchmarks.bench_ollama [--load-ms 1500] [--token-ms 50] [--requests 12]
+        [--max-concurrency 2] [--keep-alive 30m] [--num-ctx 8192]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.backend.core.agent.ollamaLlm import OllamaLLM
+
+
+DEFAULT_KEEP_ALIVE_S = 300.0
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _keep_alive_seconds(value: Any) -> float:
+    """Seconds a model stays loaded for a keep_alive of 300, "30m", -1, ..."""
+    if value is None:
+        return DEFAULT_KEEP_ALIVE_S
+    if isinstance(value, str):
+        for unit in sorted(_UNITS, key=len, reverse=True):
+            if value.endswith(unit):
+                value = float(value[:-len(unit)]) * _UNITS[unit]
+                break
+        else:
+            value = float(value)
+    return float("inf") if value < 0 else float(value)
+
+
+def _keep_alive_arg(value: str):
+    """Numbers as seconds, anything else as a duration string, as for OLLAMA_KEEP_ALIVE."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+class StandInOllama:
+    """State of the stand-in server: loaded models, request log, in-flight count."""
+
+    def __init__(self, load_s: float, token_s: float):
+        self.load_s = load_s
+        self.token_s = token_s
+        self.requests: List[Dict[str, Any]] = []
+        self.loads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # model -> (num_ctx, unload time)
+        self._loaded: Dict[str, Tuple[Optional[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        model = body["model"]
+        num_ctx = (body.get("options") or {}).get("num_ctx")
+        with self._lock:
+            self.requests.append(body)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            loaded = self._loaded.get(model)
+            cold = loaded is None or loaded[0] != num_ctx or loaded[1] < time.monotonic()
+            if cold:
+                self.loads += 1
+        try:
+            if cold:
+                time.sleep(self.load_s)
+            if body.get("messages"):
+                time.sleep(self.token_s)
+                content, done_reason = "Stand-in answer.", "stop"
+            else:
+                content, done_reason = "", "load"
+            with self._lock:
+                expires = time.monotonic() + _keep_alive_seconds(body.get("keep_alive"))
+                self._loaded[model] = (num_ctx, expires)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "done_reason": done_reason,
+        }
+
+
+def _serve(state: StandInOllama) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if self.path != "/api/chat":
+                self.send_error(404)
+                return
+            payload = json.dumps(state.chat(body)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _timed_generate(llm: OllamaLLM, prompt: str) -> float:
+    start = time.perf_counter()
+    llm.generate(prompt, system_prompt="You are a benchmark.")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--load-ms", type=float, default=1500, help="cold model load before the first token")
+    parser.add_argument("--token-ms", type=float, default=50, help="time to first token of a loaded model")
+    parser.add_argument("--requests", type=int, default=12, help="concurrent generate() calls")
+    parser.add_argument("--max-concurrency", type=int,
+                        default=int(os.getenv("OLLAMA_MAX_CONCURRENCY") or 2))
+    parser.add_argument("--keep-alive", type=_keep_alive_arg, default=os.getenv("OLLAMA_KEEP_ALIVE") or "30m")
+    parser.add_argument("--num-ctx", type=int, default=int(os.getenv("OLLAMA_NUM_CTX") or 8192))
+    args = parser.parse_args()
+
+    state = StandInOllama(args.load_ms / 1000, args.token_ms / 1000)
+    server = _serve(state)
+    host = f"http://127.0.0.1:{server.server_port}"
+
+    def make_llm(model: str) -> OllamaLLM:
+        return OllamaLLM(model, host=host, keep_alive=args.keep_alive, num_ctx=args.num_ctx,
+                         max_concurrency=args.max_concurrency)
+
+    failures: List[str] = []
+
+    def check(ok: bool, message: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {message}")
+        if not ok:
+            failures.append(message)
+
+    cold_s = _timed_generate(make_llm("bench-cold"), "First question")
+
+    warm = make_llm("bench-warm")
+    start = time.perf_counter()
+    warm.warm_up()
+    warm_up_s = time.perf_counter() - start
+    request = state.requests[-1]
+    check(request["messages"] == [], f"warm-up sends messages=[] (got {request['messages']!r})")
+    check(request.get("keep_alive") == warm.keep_alive,
+          f"warm-up sends keep_alive={warm.keep_alive!r} (got {request.get('keep_alive')!r})")
+    check((request.get("options") or {}).get("num_ctx") == args.num_ctx,
+          f"warm-up sends options.num_ctx={args.num_ctx} (got {request.get('options')!r})")
+    warm_s = _timed_generate(warm, "First question")
+    check(warm_s < state.load_s, f"first generate() after warm-up skips the load "
+                                 f"({warm_s * 1000:.0f} ms, load {args.load_ms:.0f} ms)")
+
+    loads_before = state.loads
+    state.max_in_flight = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.requests) as executor:
+        list(executor.map(lambda i: _timed_generate(warm, f"Question {i}"), range(args.requests)))
+    burst_s = time.perf_counter() - start
+    check(state.max_in_flight <= args.max_concurrency,
+          f"{args.requests} concurrent generate() calls: at most {state.max_in_flight} in flight "
+          f"(OLLAMA_MAX_CONCURRENCY={args.max_concurrency})")
+    check(state.loads == loads_before, f"no reload during the burst ({state.loads - loads_before} loads)")
+    server.shutdown()
+
+    print(f"stand-in Ollama: load {args.load_ms:.0f} ms, first token {args.token_ms:.0f} ms, "
+          f"keep_alive {args.keep_alive}, num_ctx {args.num_ctx}")
+    print(f"first generate(), cold:           {cold_s * 1000:7.1f} ms")
+    print(f"warm_up():                        {warm_up_s * 1000:7.1f} ms")
+    print(f"first generate(), after warm-up:  {warm_s * 1000:7.1f} ms")
+    print(f"{args.requests} concurrent generate() calls: {burst_s * 1000:7.1f} ms "
+          f"({burst_s / args.requests * 1000:.1f} ms/request, max {state.max_in_flight} in flight)")
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
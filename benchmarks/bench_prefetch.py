@@ -0,0 +1,94 @@
+"""Time spent in fetch_url after web_search, with and without speculative prefetch.
+
+Serves pages with a fixed delay from a local HTTP server. Each round
+"searches" (schedules the result URLs as web_search does), waits for the
+synthesis and planning calls, then fetches some of the results the way the
+planner typically does: the top two, and one page that was not a result.
+
+Usage:
+    python -m benchmarks.bench_prefetch [--rounds 10] [--results 5] [--top-n 3] [--page-delay-ms 300] [--gap-ms 1000]
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.backend.api.tools import web
+from app.backend.api.tools.prefetch import Prefetcher
+from app.backend.api.tools.web import FetchURLArgs, fetch_url
+
+
+PAGE = ("<html><body>" + "<p>Madrid hotel review and prices.</p>" * 2000 + "</body></html>").encode()
+
+
+def _serve(delay_s: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _timed_fetch(url: str) -> float:
+    start = time.perf_counter()
+    page = fetch_url(FetchURLArgs(url=url))
+    assert "text" in page, page
+    return time.perf_counter() - start
+
+
+def _run(base: str, args, top_n: int) -> tuple:
+    ttl_s = 2 * args.gap_ms / 1000
+    web.prefetcher = Prefetcher(web._fetch_page, top_n=top_n, workers=4, ttl_seconds=ttl_s)
+    result_s, other_s = [], []
+    for round_ in range(args.rounds):
+        results = [f"{base}/r{round_}/{i}" for i in range(args.results)]
+        web.prefetcher.schedule(results)
+        time.sleep(args.gap_ms / 1000)  # synthesis + next planning call
+        wanted = results[:2] + [f"{base}/other/{round_}"]
+        with ThreadPoolExecutor(len(wanted)) as executor:
+            durations = list(executor.map(_timed_fetch, wanted))
+        result_s += durations[:2]
+        other_s += durations[2:]
+    time.sleep(ttl_s + args.page_delay_ms / 1000)  # let the unused prefetches expire
+    stats = web.prefetcher.stats()
+    web.prefetcher.shutdown()
+    return sum(result_s) / len(result_s), sum(other_s) / len(other_s), stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--results", type=int, default=5)
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--page-delay-ms", type=float, default=300)
+    parser.add_argument("--gap-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    server = _serve(args.page_delay_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_port}"
+    fetch_url(FetchURLArgs(url=f"{base}/warmup"))
+
+    off_result, off_other, _ = _run(base, args, top_n=0)
+    on_result, on_other, stats = _run(base, args, top_n=args.top_n)
+    print(f"{args.rounds} rounds, page delay {args.page_delay_ms:.0f} ms, {len(PAGE) // 1024} KB pages")
+    print(f"fetch_url latency, search result: {off_result * 1000:6.1f} ms without prefetch, "
+          f"{on_result * 1000:6.1f} ms with top-{args.top_n}")
+    print(f"fetch_url latency, other page:    {off_other * 1000:6.1f} ms without prefetch, "
+          f"{on_other * 1000:6.1f} ms with top-{args.top_n}")
+    print(f"hit rate {stats['hit_rate']:.2f} ({stats['hits']} hits, {stats['misses']} misses); "
+          f"downloaded {stats['downloaded_bytes'] // 1024} KB, wasted {stats['wasted_bytes'] // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()
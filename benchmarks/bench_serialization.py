@@ -0,0 +1,81 @@
+"""Encode time and payload size of a large /run response.
+
+Compares FastAPI's default path (to_dict + jsonable_encoder + json.dumps)
+with FastJSONResponse encoding the leaves directly, and reports gzip and
+brotli sizes.
+
+Usage:
+    python -m benchmarks.bench_serialization [--leaves 300] [--result-kb 10]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.backend.api.responses import GZIP_LEVEL, brotli, dumps, orjson
+from app.backend.core.models.tool_calls import ToolCall
+from app.backend.core.reasoningTree.reasoning_tree import ReasoningTree
+
+
+def _build_tree(n_leaves: int, result_kb: int) -> ReasoningTree:
+    rng = random.Random(0)
+    vocabulary = "madrid hotel flight budget museum prado café señor route price night train".split()
+    tree = ReasoningTree("benchmark query")
+    parent = "leaf_0"
+    for i in range(n_leaves):
+        page = " ".join(rng.choice(vocabulary) for _ in range(result_kb * 180))[: result_kb * 1024]
+        call = ToolCall(tool_name="fetch_url", args={"url": f"https://example.com/{i}"}, result={"text": page})
+        leaf_id = tree.add_leaf(description=f"Read page {i}", parent_leaf=parent, tool_calls=[call], result=f"Summary {i}")
+        if i % 4 == 3:
+            parent = leaf_id
+    return tree
+
+
+def _time(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaves", type=int, default=300)
+    parser.add_argument("--result-kb", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tree = _build_tree(args.leaves, args.result_kb)
+
+    def default_path() -> bytes:
+        payload = {"reasoning_tree": tree.to_dict(), "final_answer": "answer"}
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def fast_path() -> bytes:
+        return dumps({"reasoning_tree": tree.leaves, "final_answer": "answer"})
+
+    default_s, default_body = _time(default_path, args.repeat)
+    fast_s, fast_body = _time(fast_path, args.repeat)
+    assert json.loads(default_body) == json.loads(fast_body), "payloads differ"
+
+    backend = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"tree: {len(tree)} leaves, {args.result_kb} KiB result each; fast backend: {backend}")
+    print(f"default  encode={default_s * 1000:>8.1f} ms  size={len(default_body) / 1024:>9.1f} KiB")
+    print(f"fast     encode={fast_s * 1000:>8.1f} ms  size={len(fast_body) / 1024:>9.1f} KiB  ({default_s / fast_s:.1f}x)")
+
+    for level in (9, GZIP_LEVEL):
+        gzip_s, gzipped = _time(lambda: gzip.compress(fast_body, compresslevel=level), args.repeat)
+        print(f"gzip -{level}  compress={gzip_s * 1000:>6.1f} ms  size={len(gzipped) / 1024:>9.1f} KiB")
+    if brotli is not None:
+        br_s, brotlied = _time(lambda: brotli.compress(fast_body, quality=4), args.repeat)
+        print(f"brotli   compress={br_s * 1000:>6.1f} ms  size={len(brotlied) / 1024:>9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
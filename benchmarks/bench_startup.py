@@ -0,0 +1,75 @@
+"""API cold-start import cost, measured with `python -X importtime`.
+
+Fails (exit code 1) when a provider SDK or heavy tool dependency is
+imported at startup, or when the total exceeds `--max-ms`, so it can guard
+against regressions.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--max-ms 1000] [--top 10]
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Imported only when the selected provider or a web tool needs them.
+LAZY_MODULES = ("openai", "mistralai", "ollama", "requests", "bs4")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _measure(target: str) -> Tuple[int, Dict[str, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, check=True,
+    )
+    cumulative: Dict[str, int] = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        cumulative[module] = cumulative_us
+        if indent == 1:
+            total += cumulative_us
+    return total, cumulative
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="app.backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median exceeds this")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals: List[int] = []
+    modules: Dict[str, int] = {}
+    for _ in range(args.runs):
+        total, modules = _measure(args.target)
+        totals.append(total)
+    median_ms = statistics.median(totals) / 1000
+
+    print(f"import {args.target}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f})")
+    print(f"top {args.top} top-level imports (cumulative):")
+    top_level = sorted(
+        ((us, name) for name, us in modules.items() if "." not in name),
+        reverse=True,
+    )[:args.top]
+    for us, name in top_level:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = [f"{name} is imported at startup" for name in LAZY_MODULES if name in modules]
+    if args.max_ms is not None and median_ms > args.max_ms:
+        failures.append(f"median {median_ms:.1f} ms exceeds --max-ms {args.max_ms}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Memory and time benchmark for building a large ReasoningTree.
+
+Compares the current slotted tree against an equivalent of the previous
+implementation (plain dataclasses, probing id allocation, frontier scan).
+
+Usage:
+    python -m benchmarks.bench_tree [--leaves 10000]
+"""
+import argparse
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.backend.core.models.tool_calls import ToolCall
+from app.backend.core.reasoningTree.reasoning_tree import ReasoningTree
+
+
+@dataclass
+class _LegacyToolCall:
+    tool_name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+
+
+@dataclass
+class _LegacyLeaf:
+    id: str
+    description: str
+    result: str
+    parent_leaf: Optional[str]
+    child_leaves: List[str]
+    tool_calls: List[_LegacyToolCall] = field(default_factory=list)
+
+
+class _LegacyTree:
+    def __init__(self, user_input: str) -> None:
+        self.leaves: Dict[str, _LegacyLeaf] = {
+            "leaf_0": _LegacyLeaf("leaf_0", user_input, "", None, [])
+        }
+
+    def add_leaf(self, description, parent_leaf, tool_calls, result) -> str:
+        leaf_number = len(self.leaves)
+        new_id = f"leaf_{leaf_number}"
+        while new_id in self.leaves:
+            leaf_number += 1
+            new_id = f"leaf_{leaf_number}"
+        self.leaves[new_id] = _LegacyLeaf(new_id, description, result, parent_leaf, [], tool_calls)
+        if parent_leaf in self.leaves:
+            self.leaves[parent_leaf].child_leaves.append(new_id)
+        return new_id
+
+    def get_last_leaves(self):
+        return [leaf for leaf in self.leaves.values() if not leaf.child_leaves]
+
+
+def _build(tree_cls, tool_call_cls, n_leaves: int, branching: int = 3):
+    tree = tree_cls("benchmark query")
+    parents = ["leaf_0"]
+    next_parents: List[str] = []
+    for i in range(n_leaves):
+        parent = parents[(i // branching) % len(parents)]
+        call = tool_call_cls(tool_name="web_search", args={"query": f"q{i}"}, result=f"r{i}")
+        leaf_id = tree.add_leaf(description=f"step {i}", parent_leaf=parent, tool_calls=[call], result=f"s{i}")
+        next_parents.append(leaf_id)
+        if len(next_parents) >= len(parents) * branching:
+            parents, next_parents = next_parents, []
+        if i % 100 == 0:
+            tree.get_last_leaves()
+    return tree
+
+
+def _measure(label: str, tree_cls, tool_call_cls, n_leaves: int) -> int:
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = _build(tree_cls, tool_call_cls, n_leaves)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} leaves={len(tree.leaves):>7}  memory={current / 1024:>9.1f} KiB  build={elapsed * 1000:>8.1f} ms")
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaves", type=int, default=10_000)
+    args = parser.parse_args()
+
+    legacy = _measure("legacy", _LegacyTree, _LegacyToolCall, args.leaves)
+    current = _measure("current", ReasoningTree, ToolCall, args.leaves)
+    print(f"memory saved: {(legacy - current) / 1024:.1f} KiB ({(1 - current / legacy) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Check which planned steps the near-duplicate index prunes.
+
+Paraphrases of an indexed step (different planning verb, plural, dropped
+stop words) must be pruned; steps with the same words in a different order
+("Madrid to Paris" after "Paris to Madrid"), or a different target, must be
+kept. Exits non-zero on
+any unexpected decision.
+
+Usage:
+    python -m benchmarks.check_step_dedup [--threshold 0.7]
+"""
+import argparse
+import sys
+
+from app.backend.core.reasoningTree.step_index import StepIndex
+
+
+def _search(description: str, query: str):
+    return description, [{"tool_name": "web_search", "args": {"query": query}}]
+
+
+INDEXED = {
+    "leaf_1": _search("Search for flights from Paris to Madrid", "flights Paris to Madrid"),
+    "leaf_2": _search("Find hotels in Madrid", "hotels in Madrid"),
+    "leaf_3": ("Read the Prado opening hours page",
+               [{"tool_name": "fetch_url", "args": {"url": "https://www.museodelprado.es/en/visit"}}]),
+}
+
+# (step, expected duplicate or None)
+CASES = [
+    (_search("Look up hotels in Madrid", "hotels Madrid"), "leaf_2"),
+    (_search("Look up hotels in Madrid", "Madrid hotels"), None),
+    (_search("Search for hotels in Madrid", "hotels in Madrid"), "leaf_2"),
+    (_search("Search for flights from Paris to Madrid", "flights Paris to Madrid"), "leaf_1"),
+    (_search("Search for flights from Madrid to Paris", "flights Madrid to Paris"), None),
+    (_search("Find hotels in Paris", "hotels in Paris"), None),
+    (_search("Compare train and flight prices from Paris to Madrid", "train vs flight Paris Madrid"), None),
+    (("Read the Prado opening hours page",
+      [{"tool_name": "fetch_url", "args": {"url": "https://www.museodelprado.es/en/visit/"}}]), "leaf_3"),
+    (("Read the Prado collection page",
+      [{"tool_name": "fetch_url", "args": {"url": "https://www.museodelprado.es/en/the-collection"}}]), None),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    index = StepIndex(threshold=args.threshold)
+    for step_id, (description, tool_calls) in INDEXED.items():
+        index.add(step_id, description, tool_calls)
+
+    failures = 0
+    for (description, tool_calls), expected in CASES:
+        found = index.find_duplicate(description, tool_calls)
+        got = found[0] if found else None
+        ok = got == expected
+        failures += not ok
+        decision = f"pruned as {got} ({found[1]:.2f})" if found else "kept"
+        print(f"{'ok  ' if ok else 'FAIL'} {description!r} {tool_calls[0]['args']}: {decision}")
+    if failures:
+        sys.exit(f"{failures} unexpected decision(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Fake LLM provider and web tools for benchmarks that drive the real API.
+
+Calls sleep for a fixed time, as a blocking SDK call would, so the numbers
+reflect the server's scheduling rather than network or model speed.
+`install()` registers the provider as LLM_PROVIDER=fake and swaps the web
+tools registered by the agent endpoints.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app.backend.api.tools.web import FetchURLArgs, WebSearchArgs
+from app.backend.core.agent.llm import LLM
+from app.backend.core.agent.providers import ProviderSpec, register_provider
+from app.backend.core.agent.tool import tool
+
+
+LLM_LATENCY_S = 0.05
+TOOL_LATENCY_S = 0.05
+BREADTH = 2
+DEPTH = 1
+
+tool_runs = 0
+_tool_lock = threading.Lock()
+
+
+def tree_plan(context: str) -> List[Dict[str, Any]]:
+    """`BREADTH` steps per leaf, one web_search each, until the branch is `DEPTH` deep."""
+    if context.count("→ ") >= DEPTH:
+        return []
+    steps = []
+    for _ in range(BREADTH):
+        # Random topics so that the step deduplication never prunes them.
+        topic = uuid.uuid4().hex[:12]
+        steps.append({
+            "description": f"Investigate {topic}",
+            "tool_calls": [{"tool_name": "web_search", "args": {"query": topic}}],
+        })
+    return steps
+
+
+# Returns the plan for a planning prompt; benchmarks can replace it.
+planner: Callable[[str], List[Dict[str, Any]]] = tree_plan
+
+
+class LatencyLLM(LLM):
+    """Returns `planner` plans and canned syntheses after a fixed delay."""
+
+    provider = "fake"
+
+    def init_client(self):
+        return None
+
+    def generate(self, user_input: str, system_prompt=None, cancel_token=None) -> str:
+        time.sleep(LLM_LATENCY_S)
+        if system_prompt is not None:
+            return "Synthesized step outcome."
+        return json.dumps(planner(user_input))
+
+
+def _count_tool_run() -> None:
+    global tool_runs
+    time.sleep(TOOL_LATENCY_S)
+    with _tool_lock:
+        tool_runs += 1
+
+
+@tool("web_search", WebSearchArgs, "Fake web search")
+def fake_web_search(args: WebSearchArgs) -> dict:
+    _count_tool_run()
+    return {"results": [
+        {"title": f"{args.query} {i}", "url": f"https://example.com/{i}", "snippet": "snippet " * 20}
+        for i in range(args.max_results)
+    ]}
+
+
+@tool("fetch_url", FetchURLArgs, "Fake fetch")
+def fake_fetch_url(args: FetchURLArgs) -> dict:
+    _count_tool_run()
+    return {"text": "page " * 200}
+
+
+def install(
+    llm_ms: float = 50,
+    tool_ms: float = 50,
+    breadth: int = BREADTH,
+    depth: int = DEPTH,
+    plan: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+) -> None:
+    """Make the agent API use the fake provider and tools."""
+    global LLM_LATENCY_S, TOOL_LATENCY_S, BREADTH, DEPTH, planner
+    LLM_LATENCY_S = llm_ms / 1000
+    TOOL_LATENCY_S = tool_ms / 1000
+    BREADTH, DEPTH = breadth, depth
+    planner = plan or tree_plan
+
+    register_provider("fake", ProviderSpec(__name__, "LatencyLLM", "FAKE_MODEL", "fake"))
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.pop("LLM_ROUTING", None)
+    os.environ["LLM_WARMUP"] = "0"
+
+    from app.backend.api import agent
+
+    agent.web_search, agent.fetch_url = fake_web_search, fake_fetch_url